@@ -0,0 +1,726 @@
+"""
+Compute kernels of the RSS Attendance and Post OT forms.
+Kept apart from main.py so they can be imported and benchmarked without calling the APIs.
+"""
+
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Day status labels counted by the RSS Attendance totals
+STATUS_LABELS = (
+    "Full Day Leave",
+    "Half Day Leave",
+    "Full Day Off",
+    "Half Day Off",
+    "Full Day MC",
+    "Half Day MC",
+    "Hospitalisation Leave",
+    "Full Day Others",
+    "Half Day Others",
+    "Full Day Cover",
+    "Half Day Cover",
+    "No Cover",
+    "Not Available",
+    "NA",
+    "Weekend (Sunday)",
+    "Public Holiday",
+    "Sat",
+)
+
+# properties.D1... to properties.D31..., e.g. properties.D1__x0020__Day but not properties.D10 for day 1
+DAY_COLUMN_RE = re.compile(r"^properties\.D([1-9]|[12][0-9]|3[01])(?![0-9])")
+
+
+def dayColumns(df):
+    """
+    Get the per-day property columns that can hold a day status.
+    input: (pandas.DataFrame)df, The normalized issue data details.
+    return: (list)columns, The non-numeric properties.D<day>* columns.
+    """
+    return [
+        column
+        for column in df.columns
+        if DAY_COLUMN_RE.match(column)
+        and not pd.api.types.is_numeric_dtype(df[column].dtype)
+    ]
+
+
+def tallyStatuses(df, labels=STATUS_LABELS, columns=None):
+    """
+    Count every status label of every row in one pass over the day columns.
+    input: (pandas.DataFrame)df, The normalized issue data details.
+           (tuple)labels, The status labels to count.
+           (list)columns, The columns to count in, defaults to dayColumns(df).
+    return: (pandas.DataFrame)counts, One int64 column per label, indexed like df.
+    """
+    columns = dayColumns(df) if columns is None else columns
+    rows = len(df)
+    values = df[columns].to_numpy(dtype=object).ravel()
+
+    # Code of the label of each cell, -1 for anything else
+    try:
+        codes = pd.Categorical(values, categories=labels).codes
+    except TypeError:
+        # Unhashable cells (lists, dicts) can not be a status
+        lookup = {label: code for code, label in enumerate(labels)}
+        codes = np.fromiter(
+            (lookup.get(v, -1) if isinstance(v, str) else -1 for v in values),
+            dtype=np.int64,
+            count=len(values),
+        )
+
+    counts = countCodes(np.reshape(codes, (rows, len(columns))), len(labels))
+
+    return pd.DataFrame(counts, index=df.index, columns=list(labels))
+
+
+def countCodes(codes, width):
+    """
+    Count the codes of every row in one histogram.
+    input: (numpy.ndarray)codes, int (rows x cells), -1 or any code from width up is not counted.
+           (int)width, The number of codes counted.
+    return: (numpy.ndarray)counts, int64 (rows x width)
+    """
+    rows, cells = codes.shape
+    codes = codes.astype(np.int64)
+    codes[codes >= width] = -1
+
+    # Histogram of (row, code) pairs, bin 0 of each row collects the -1 codes
+    bins = np.repeat(np.arange(rows) * (width + 1), cells) + codes.ravel() + 1
+    return np.bincount(bins, minlength=rows * (width + 1)).reshape(rows, width + 1)[:, 1:]
+
+
+def rssStatusTotals(counts):
+    """
+    Compute the RSS Attendance totals from the status counts.
+    input: (pandas.DataFrame)counts, The result of tallyStatuses.
+    return: (pandas.DataFrame)totals, The Sum_* and Total* columns, indexed like counts.
+    """
+    # Built as a dict of columns and turned into a frame once
+    totals = {}
+
+    ##Calculate the total leave, off, mc, hospitalisation
+    totals["Sum_FullLeave"] = counts["Full Day Leave"]
+    totals["Sum_HalfLeave"] = counts["Half Day Leave"]
+    totals["Sum_FullOff"] = counts["Full Day Off"]
+    totals["Sum_HalfOff"] = counts["Half Day Off"]
+    totals["Sum_Leave"] = totals["Sum_FullLeave"] + totals["Sum_HalfLeave"] * 0.5
+    totals["TotalOff"] = totals["Sum_FullOff"] + totals["Sum_HalfOff"] * 0.5
+
+    totals["Sum_HalfMC"] = counts["Half Day MC"]
+    totals["Sum_FullMC"] = counts["Full Day MC"]
+    totals["Sum_Hospitalisation"] = counts["Hospitalisation Leave"]
+    totals["Sum_SickLeave"] = (
+        totals["Sum_FullMC"] + totals["Sum_HalfMC"] * 0.5 + totals["Sum_Hospitalisation"]
+    )
+    totals["TotalLeaves"] = totals["Sum_SickLeave"] + totals["Sum_Leave"]
+
+    totals["Sum_FullOthers"] = counts["Full Day Others"]
+    totals["Sum_HalfOthers"] = counts["Half Day Others"]
+    totals["Sum_Others"] = totals["Sum_FullOthers"] + totals["Sum_HalfOthers"] * 0.5
+
+    # Calculate absent day with covering officer
+    totals["TotalFullCovered"] = counts["Full Day Cover"]
+    totals["TotalHalfCovered"] = counts["Half Day Cover"]
+    totals["TotalCovered"] = (
+        totals["TotalFullCovered"] + totals["TotalHalfCovered"] * 0.5
+    )
+    totals["TotalAbsentDays"] = (
+        totals["TotalOff"] + totals["Sum_Others"] + totals["TotalLeaves"]
+    )
+    totals["TotalNonCovered"] = totals["TotalAbsentDays"] - totals["TotalCovered"]
+
+    totals["Sum_NotAvailable"] = counts["Not Available"]
+    totals["Sum_NA"] = counts["NA"]
+    totals["Sum_Weekend"] = counts["Weekend (Sunday)"]
+    totals["Sum_Public Holiday"] = counts["Public Holiday"]
+    totals["Sum_Saturday"] = counts["Sat"]
+
+    totals["Sum_Day"] = 31
+    totals["Sum_WorkingDays"] = (
+        totals["Sum_Day"]
+        - totals["Sum_NotAvailable"]
+        - totals["Sum_SickLeave"]
+        - totals["Sum_Others"]
+        - totals["Sum_Leave"]
+        - totals["Sum_Public Holiday"]
+        - totals["Sum_Weekend"]
+        - totals["Sum_NA"]
+    )
+
+    totals["Sum_Day_Month"] = 26
+    totals["Total__x0020__Working__x0020__Days"] = (
+        totals["Sum_Day_Month"] - totals["TotalNonCovered"] - totals["Sum_NotAvailable"]
+    )
+
+    return pd.DataFrame(totals, index=counts.index)
+
+
+def saturdayOTMask(df, days):
+    """
+    Find the Saturdays worked as OT.
+    input: (pandas.DataFrame)df, The normalized issue data details.
+           (list)days, The day numbers of the columns of the mask.
+    return: (numpy.ndarray)mask, bool (rows x days), True where properties.D<day>__x0020__Day
+            is "Sat" and properties.D<day>__x002d__Remarks is "OT".
+    """
+    mask = np.zeros((len(df), len(days)), dtype=bool)
+    for i, d in enumerate(days):
+        day_column = "properties.D" + str(d) + DAY_NAME
+        remarks_column = "properties.D" + str(d) + REMARKS
+        if day_column in df.columns and remarks_column in df.columns:
+            mask[:, i] = ((df[day_column] == "Sat") & (df[remarks_column] == "OT")).to_numpy(
+                dtype=bool, na_value=False
+            )
+    return mask
+
+
+def clampWorkHours(work, saturday_ot):
+    """
+    Apply the work hour rules to a matrix of raw work hours.
+    If the day is saturday and is OT, work hour will be 4.
+    If more than 8, put 8. Elif if between 4 to 8, minus 1 and less than 4, remain.
+    NaN work hours stay NaN, except on a Saturday OT.
+    input: (numpy.ndarray)work, float (rows x days), The hours between time in and time out.
+           (numpy.ndarray)saturday_ot, bool (rows x days), The result of saturdayOTMask.
+    return: (numpy.ndarray)work_hours, float (rows x days)
+    """
+    work = np.asarray(work, dtype=float)
+    return np.select(
+        [saturday_ot, work > 8, work > 4], [4.0, 8.0, work - 1], default=work
+    )
+
+
+# Per-day property suffixes, e.g. properties.D1__x0020__Time__x0020__In
+TIME_IN = "__x0020__Time__x0020__In"
+TIME_OUT = "__x0020__Time__x0020__Out"
+OT_TIME_IN = "OTTimein"
+OT_TIME_OUT = "OTTimeOut"
+OT_MEAL = "__x0020__OT__x0020__Meal"
+
+DAYS = tuple(range(1, 32))
+
+# The day and remarks fields the Saturday OT rule looks at
+DAY_NAME = "__x0020__Day"
+REMARKS = "__x002d__Remarks"
+
+# Day field values coded in the code matrices of AttendanceMonth, the status labels first
+DAY_CODES = STATUS_LABELS + ("OT",)
+DAY_CODE = {label: code for code, label in enumerate(DAY_CODES)}
+
+
+def daysWithColumns(df, *suffixes):
+    """
+    Get the days that have a properties.D<day><suffix> column for every suffix.
+    return: (list)days
+    """
+    return [
+        d
+        for d in DAYS
+        if all("properties.D" + str(d) + suffix in df.columns for suffix in suffixes)
+    ]
+
+
+def dayValues(df, suffix, days):
+    """
+    Gather the properties.D<day><suffix> columns into one matrix.
+    return: (numpy.ndarray)values, object (rows x days)
+    """
+    return df[["properties.D" + str(d) + suffix for d in days]].to_numpy(dtype=object)
+
+
+def buildHHMMTable():
+    """
+    Map every valid "HH:MM" string to its minutes since midnight.
+    Hours and minutes may have one or two digits, as accepted by
+    pd.to_datetime(format="%H:%M").
+    return: (dict)table, e.g. {"08:30": 510.0, "8:30": 510.0, ...}
+    """
+    table = {}
+    for h in range(24):
+        for m in range(60):
+            for hour in {str(h), f"{h:02d}"}:
+                for minute in {str(m), f"{m:02d}"}:
+                    table[hour + ":" + minute] = float(h * 60 + m)
+    return table
+
+
+# Precomputed, there are only 1,440 valid times
+HHMM_MINUTES = buildHHMMTable()
+
+
+def parseHHMM(value):
+    """
+    Parse one "HH:MM" string into minutes since midnight.
+    return: (float)minutes, NaN if value is missing or malformed, like errors="coerce"
+    """
+    if isinstance(value, str):
+        return HHMM_MINUTES.get(value, np.nan)
+    return np.nan
+
+
+def parseHHMMArray(values):
+    """
+    Parse an array (or Series) of "HH:MM" strings into minutes since midnight.
+    Each distinct value is looked up once, which makes repeated times nearly free.
+    return: (numpy.ndarray)minutes, float, shaped like values, NaN if missing or malformed
+    """
+    values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values.ravel(), use_na_sentinel=True)
+    # The last entry is the NaN looked up by the -1 code of missing values
+    lookup = np.fromiter(
+        (parseHHMM(value) for value in uniques), dtype=float, count=len(uniques)
+    )
+    lookup = np.append(lookup, np.nan)
+    return lookup[codes].reshape(values.shape)
+
+
+def minutesOfDay(values):
+    """
+    Parse a matrix of "HH:MM" strings into minutes since midnight.
+    Malformed or missing times are NaN.
+    return: (numpy.ndarray)minutes, float, shaped like values
+    """
+    return parseHHMMArray(values)
+
+
+def hourDifference(start, end):
+    """
+    Hours from start to end, both minutes since midnight, wrapping past midnight.
+    Computed as hours plus minutes / 60 like the original per-day loops, so the
+    results are identical to the last bit.
+    return: (numpy.ndarray)hours, NaN where start or end is NaN
+    """
+    return (end // 60 - start // 60) + (end % 60 - start % 60) / 60
+
+
+def wrapNegative(hours):
+    ## if hours = -ve, need to add 24 hours
+    return np.where(hours < 0, hours + 24, hours)
+
+
+def rssHourTotals(df):
+    """
+    Compute the OT and work hours of every day of every form from the day matrices.
+    input: (pandas.DataFrame)df, The normalized issue data details.
+    return: (pandas.DataFrame)hours, indexed like df, with
+            D<day>OT, for the days with OT time in, OT time out and OT meal columns,
+            Total_x200_Overtime_Hours, the sum of the D<day>OT,
+            D<day>_Work_Hour, for the days with time in and time out columns,
+            Sum_WorkingHours, the sum of the D<day>_Work_Hour.
+    """
+    ##Update OT hours
+    ##Only update days that there are values
+    ot_days = daysWithColumns(df, OT_TIME_IN, OT_TIME_OUT, OT_MEAL)
+    ot_in = minutesOfDay(dayValues(df, OT_TIME_IN, ot_days))
+    ot_out = minutesOfDay(dayValues(df, OT_TIME_OUT, ot_days))
+    meal = (
+        df[["properties.D" + str(d) + OT_MEAL for d in ot_days]]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=float)
+    )
+    ot = wrapNegative(hourDifference(ot_in, ot_out) - meal)
+
+    ##Update Working Hours
+    work_days = daysWithColumns(df, TIME_IN, TIME_OUT)
+    time_in = minutesOfDay(dayValues(df, TIME_IN, work_days))
+    time_out = minutesOfDay(dayValues(df, TIME_OUT, work_days))
+    work = clampWorkHours(
+        wrapNegative(hourDifference(time_in, time_out)),
+        saturdayOTMask(df, work_days),
+    )
+
+    return pd.DataFrame(hourColumns(ot_days, ot, work_days, work), index=df.index)
+
+
+def hourColumns(ot_days, ot, work_days, work):
+    """
+    Name the OT and work hour matrices by day and add their totals.
+    return: (dict)columns, The columns of rssHourTotals.
+    """
+    # Summed in the same memory order whichever way the matrices were built, so the totals
+    # of the frame and of the compact model are equal to the last bit
+    ot, work = np.ascontiguousarray(ot), np.ascontiguousarray(work)
+    columns = {}
+    for i, d in enumerate(ot_days):
+        columns["D" + str(d) + "OT"] = ot[:, i]
+    columns["Total_x200_Overtime_Hours"] = np.nansum(ot, axis=1)
+    for i, d in enumerate(work_days):
+        columns["D" + str(d) + "_Work_Hour"] = work[:, i]
+    columns["Sum_WorkingHours"] = np.nansum(work, axis=1)
+    return columns
+
+
+def postOTHours(df):
+    """
+    Compute the OT hours of the Post OT forms.
+    input: (pandas.DataFrame)df, The normalized Post OT Form issue data details.
+    return: (numpy.ndarray)hours, float, ActualOTEnd - ActualOTStart - RSSMeal1, wrapped past midnight.
+    """
+    ot_in = parseHHMMArray(df["properties.ActualOTStart"])
+    ot_out = parseHHMMArray(df["properties.ActualOTEnd"])
+    meal = pd.to_numeric(df["properties.RSSMeal1"], errors="coerce").to_numpy(dtype=float)
+    return wrapNegative(hourDifference(ot_in, ot_out) - meal)
+
+
+class StageMonitor:
+    """
+    Instrumentation hook of the compute stages.
+    Records the wall time of every stage and, when asked for, the peak memory allocated
+    (tracemalloc, numpy and pandas buffers included) and the number of dataframe copies.
+    The copies are the calls of DataFrame.copy and pandas.concat made by the thread running
+    the stage, counted by wrappers installed only while a stage counting copies runs.
+    tracemalloc traces the whole process, so the traced stages run one at a time, and it is
+    started by the first of them and left on. Other threads still allocate meanwhile, the
+    peaks of stages run in threads next to other work are only isolated in a compute process.
+    input: (bool)trace_memory, Tracing memory slows the stages down, off by default.
+           (callable)report, Called with each finished stage record, e.g. logger.info.
+           (bool)count_copies, Count the copies, off by default, the records have None then.
+    """
+
+    # The monitor running a stage in each thread, and the stages running in all of them
+    running = threading.local()
+    lock = threading.Lock()
+    # Held by the traced stage running, reentrant for the nested stages
+    trace_lock = threading.RLock()
+    active_stages = 0
+    originals = None
+
+    def __init__(self, trace_memory=False, report=None, count_copies=False):
+        self.trace_memory = trace_memory
+        self.report = report
+        self.count_copies = count_copies
+        self.stages = []
+        self.current = None
+
+    @classmethod
+    def countCopies(cls, start):
+        """
+        Install the copy counting wrappers as the first counting stage starts, remove them
+        as the last one ends.
+        """
+        with cls.lock:
+            cls.active_stages += 1 if start else -1
+            if start and cls.originals is None:
+                copy, concat = cls.originals = (pd.DataFrame.copy, pd.concat)
+
+                def countedCopy(self, *args, **kwargs):
+                    cls.copiedHere()
+                    return copy(self, *args, **kwargs)
+
+                def countedConcat(*args, **kwargs):
+                    cls.copiedHere()
+                    return concat(*args, **kwargs)
+
+                pd.DataFrame.copy, pd.concat = countedCopy, countedConcat
+            elif not start and cls.active_stages == 0:
+                pd.DataFrame.copy, pd.concat = cls.originals
+                cls.originals = None
+
+    @classmethod
+    def copiedHere(cls):
+        monitor = getattr(cls.running, "monitor", None)
+        if monitor is not None:
+            monitor.copied()
+
+    @contextmanager
+    def stage(self, name):
+        record = {
+            "stage": name,
+            "seconds": 0.0,
+            "copies": 0 if self.count_copies else None,
+            "peak_bytes": None,
+        }
+        parent, self.current = self.current, record
+        parent_monitor = getattr(self.running, "monitor", None)
+        self.running.monitor = self
+        if self.count_copies:
+            self.countCopies(True)
+        if self.trace_memory:
+            self.trace_lock.acquire()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            # The peak above what was allocated before the stage
+            traced_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if self.trace_memory:
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1] - traced_before
+                self.trace_lock.release()
+            if self.count_copies:
+                self.countCopies(False)
+            self.running.monitor = parent_monitor
+            self.current = parent
+            self.stages.append(record)
+            if self.report is not None:
+                self.report(self.format(record))
+
+    def copied(self, count=1):
+        """
+        Count a copy of a dataframe in the current stage.
+        """
+        if self.current is not None and self.current["copies"] is not None:
+            self.current["copies"] += count
+
+    @staticmethod
+    def format(record):
+        text = f"{record['stage']}: {record['seconds']:.3f}s"
+        if record["copies"] is not None:
+            text += f", {record['copies']} copies"
+        if record["peak_bytes"] is not None:
+            text += f", peak {record['peak_bytes'] / 2**20:.1f} MiB"
+        return text
+
+    def totals(self):
+        """
+        return: (dict) the total seconds and copies and the highest peak of all stages,
+                None for what was not measured
+        """
+        peaks = [r["peak_bytes"] for r in self.stages if r["peak_bytes"] is not None]
+        copies = [r["copies"] for r in self.stages if r["copies"] is not None]
+        return {
+            "seconds": sum(r["seconds"] for r in self.stages),
+            "copies": sum(copies) if copies else None,
+            "peak_bytes": max(peaks) if peaks else None,
+        }
+
+
+def computeRSS(df, monitor=None):
+    """
+    Compute every derived column of the RSS Attendance forms.
+    The totals, OT and work hours are built apart as compact frames and joined to the
+    issue data details once, so the wide details frame is copied a single time.
+    input: (pandas.DataFrame)df, The normalized RSS Attendance issue data details.
+           (StageMonitor)monitor, Records the stages, optional.
+    return: (pandas.DataFrame)dfRSS2, df with the Sum_*, Total*, D<day>OT and D<day>_Work_Hour columns.
+    """
+    monitor = monitor or StageMonitor()
+
+    with monitor.stage("tally"):
+        totals = rssStatusTotals(tallyStatuses(df))
+
+    with monitor.stage("hours"):
+        hours = rssHourTotals(df)
+
+    with monitor.stage("join"):
+        dfRSS2 = pd.concat([df, totals, hours], axis=1)
+
+    return dfRSS2
+
+
+class IssueRecord:
+    """
+    Metadata of one form of an AttendanceMonth.
+    current: (dict) The "properties.<key>" values of the form the updates are compared with.
+    """
+
+    __slots__ = (
+        "id",
+        "number",
+        "status",
+        "state",
+        "createdDateTime",
+        "assigneeName",
+        "assigneeId",
+        "current",
+    )
+
+    def __init__(
+        self,
+        id,
+        number,
+        status=None,
+        state=None,
+        createdDateTime=None,
+        assigneeName=None,
+        assigneeId=None,
+        current=None,
+    ):
+        self.id = id
+        self.number = number
+        self.status = status
+        self.state = state
+        self.createdDateTime = createdDateTime
+        self.assigneeName = assigneeName
+        self.assigneeId = assigneeId
+        self.current = current or {}
+
+
+class AttendanceMonth:
+    """
+    Compact model of the RSS Attendance forms, one row per form and one column per day.
+    records: (list) One IssueRecord per form.
+    codes: (dict) suffix -> int8 (forms x 31), The DAY_CODES code of every D<day><suffix> field,
+           -1 for any other value. Only the suffixes that hold a coded value have a matrix.
+    minutes: (dict) suffix -> float32 (forms x 31), TIME_IN, TIME_OUT, OT_TIME_IN and OT_TIME_OUT
+             in minutes since midnight, NaN if missing or malformed. Minutes are exact in float32.
+    hours: (dict) suffix -> float64 (forms x 31), OT_MEAL in hours as entered, NaN if missing or
+           not a number. Kept in float64, a meal of 0.33 hours is not a whole number of minutes.
+    present: (dict) suffix -> bool (31), The days some form has a D<day><suffix> field for.
+    """
+
+    __slots__ = ("records", "codes", "minutes", "hours", "present")
+
+    def __init__(self, records, codes=None, minutes=None, present=None, hours=None):
+        self.records = records
+        self.codes = codes or {}
+        self.minutes = minutes or {}
+        self.hours = hours or {}
+        self.present = present or {}
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self):
+        """
+        return: (int) the bytes of the code, minute and hour matrices
+        """
+        matrices = [*self.codes.values(), *self.minutes.values(), *self.hours.values()]
+        return sum(matrix.nbytes for matrix in matrices)
+
+    def days(self, *suffixes):
+        """
+        Get the days that some form has a D<day><suffix> field for, for every suffix.
+        return: (list)days, like daysWithColumns
+        """
+        return [
+            d
+            for d in DAYS
+            if all(suffix in self.present and self.present[suffix][d - 1] for suffix in suffixes)
+        ]
+
+    def dayMinutes(self, suffix, days):
+        """
+        return: (numpy.ndarray)minutes, float64 (forms x days), NaN if the suffix has no matrix
+        """
+        if suffix not in self.minutes:
+            return np.full((len(self), len(days)), np.nan)
+        return self.minutes[suffix][:, [d - 1 for d in days]].astype(float)
+
+    def dayHours(self, suffix, days):
+        """
+        return: (numpy.ndarray)hours, float64 (forms x days), NaN if the suffix has no matrix
+        """
+        if suffix not in self.hours:
+            return np.full((len(self), len(days)), np.nan)
+        return self.hours[suffix][:, [d - 1 for d in days]]
+
+    def saturdayOT(self, days):
+        """
+        return: (numpy.ndarray)mask, bool (forms x days), like saturdayOTMask
+        """
+        if DAY_NAME not in self.codes or REMARKS not in self.codes:
+            return np.zeros((len(self), len(days)), dtype=bool)
+        columns = [d - 1 for d in days]
+        return (self.codes[DAY_NAME][:, columns] == DAY_CODE["Sat"]) & (
+            self.codes[REMARKS][:, columns] == DAY_CODE["OT"]
+        )
+
+    def frame(self, *parts):
+        """
+        Build the dataframe of the forms with their metadata, their current properties and more columns.
+        The columns are named like the normalized issue data details.
+        input: (pandas.DataFrame)parts, Columns of the forms, indexed 0 to len - 1.
+        return: (pandas.DataFrame)df
+        """
+        records = self.records
+        columns = {
+            "id": [r.id for r in records],
+            "number": [r.number for r in records],
+            "status": [r.status for r in records],
+            "state": [r.state for r in records],
+            "createdDateTime": [r.createdDateTime for r in records],
+            "assignee.displayName": [r.assigneeName for r in records],
+            "assignee.id": [r.assigneeId for r in records],
+        }
+        keys = dict.fromkeys(key for r in records for key in r.current)
+        for key in keys:
+            columns[key] = [r.current.get(key) for r in records]
+        return pd.concat([pd.DataFrame(columns), *parts], axis=1)
+
+
+def tallyMonth(month):
+    """
+    Count every status label of every form from the code matrices.
+    input: (AttendanceMonth)month
+    return: (pandas.DataFrame)counts, like tallyStatuses
+    """
+    if month.codes:
+        codes = np.hstack(list(month.codes.values()))
+    else:
+        codes = np.full((len(month), 0), -1, dtype=np.int8)
+    counts = countCodes(codes, len(STATUS_LABELS))
+    return pd.DataFrame(counts, columns=list(STATUS_LABELS))
+
+
+def monthHourTotals(month):
+    """
+    Compute the OT and work hours of every day of every form from the minute matrices.
+    Computed in float64, like rssHourTotals.
+    input: (AttendanceMonth)month
+    return: (pandas.DataFrame)hours, like rssHourTotals
+    """
+    ot_days = month.days(OT_TIME_IN, OT_TIME_OUT, OT_MEAL)
+    ot = wrapNegative(
+        hourDifference(
+            month.dayMinutes(OT_TIME_IN, ot_days), month.dayMinutes(OT_TIME_OUT, ot_days)
+        )
+        - month.dayHours(OT_MEAL, ot_days)
+    )
+
+    work_days = month.days(TIME_IN, TIME_OUT)
+    work = clampWorkHours(
+        wrapNegative(
+            hourDifference(
+                month.dayMinutes(TIME_IN, work_days), month.dayMinutes(TIME_OUT, work_days)
+            )
+        ),
+        month.saturdayOT(work_days),
+    )
+
+    return pd.DataFrame(hourColumns(ot_days, ot, work_days, work))
+
+
+def computeMonth(month, monitor=None):
+    """
+    Compute every derived column of the RSS Attendance forms from the compact model.
+    input: (AttendanceMonth)month
+           (StageMonitor)monitor, Records the stages, optional.
+    return: (pandas.DataFrame)dfRSS2, The metadata and current properties of the forms with
+            the Sum_*, Total*, D<day>OT and D<day>_Work_Hour columns, like computeRSS.
+    """
+    monitor = monitor or StageMonitor()
+
+    with monitor.stage("tally"):
+        totals = rssStatusTotals(tallyMonth(month))
+
+    with monitor.stage("hours"):
+        hours = monthHourTotals(month)
+
+    with monitor.stage("join"):
+        dfRSS2 = month.frame(totals, hours)
+
+    return dfRSS2
+
+
+def computeMonthStages(month, trace_memory=False):
+    """
+    computeMonth with a StageMonitor of its own, returned along with the result, for
+    running in a process pool where the monitor of the caller can not be updated.
+    input: (AttendanceMonth)month
+           (bool)trace_memory, Trace the memory and count the copies of the stages, see StageMonitor.
+    return: (tuple) the dataframe of computeMonth and the StageMonitor
+    """
+    monitor = StageMonitor(trace_memory=trace_memory, count_copies=trace_memory)
+    return computeMonth(month, monitor), monitor
@@ -0,0 +1,70 @@
+"""
+Peak memory and copy count of the RSS compute stage: attendance.computeRSS, which
+joins the derived columns to the issue data details once, against the per-day copy
+loops it replaced. Both are run under an attendance.StageMonitor.
+
+    python benchmarks/bench_compute.py [--sizes 500 2000]
+"""
+
+import argparse
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import StageMonitor, computeRSS  # noqa: E402
+from bench_hours import legacyHourTotals  # noqa: E402
+from bench_tally import legacyStatusTotals  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+
+
+def legacyCompute(df, monitor):
+    """
+    The RSS compute section of main.py before computeRSS, its copies counted by the monitor.
+    """
+    with monitor.stage("legacy"):
+        return legacyHourTotals(legacyStatusTotals(df))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000])
+    args = parser.parse_args()
+
+    print(
+        f"{'issues':>8} {'legacy copies':>14} {'legacy peak':>12} "
+        f"{'copies':>7} {'peak':>10} {'ratio':>6}"
+    )
+    for size in args.sizes:
+        df = pd.json_normalize(makeRSSIssues(size))
+
+        legacy = StageMonitor(trace_memory=True, count_copies=True)
+        with warnings.catch_warnings():
+            # The legacy loops fragment the frame on purpose
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            expected = legacyCompute(df.copy(), legacy)
+
+        monitor = StageMonitor(trace_memory=True, count_copies=True)
+        result = computeRSS(df, monitor)
+
+        for column in result.columns.difference(df.columns):
+            np.testing.assert_allclose(
+                result[column].to_numpy(dtype=float),
+                expected[column].to_numpy(dtype=float),
+                err_msg=column,
+            )
+
+        before, after = legacy.totals(), monitor.totals()
+        print(
+            f"{size:>8} {before['copies']:>14} {before['peak_bytes'] / 2**20:>9.1f}MiB "
+            f"{after['copies']:>7} {after['peak_bytes'] / 2**20:>7.1f}MiB "
+            f"{before['peak_bytes'] / after['peak_bytes']:>5.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
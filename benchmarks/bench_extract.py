@@ -0,0 +1,89 @@
+"""
+Benchmark and parity check of the extraction stage: extraction.extractIssues against
+the pandas.json_normalize of every field it replaced, for time, peak memory and width.
+
+    python benchmarks/bench_extract.py [--sizes 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import computeRSS, postOTHours  # noqa: E402
+from extraction import POST_OT_SPEC, RSS_SPEC, extractIssues  # noqa: E402
+from synthetic import makePostOTIssues, makeRSSIssues  # noqa: E402
+
+
+def traced(function, *args):
+    """
+    return: the result, the seconds and the peak bytes of function(*args)
+    The time is taken without tracemalloc, which slows the Python loops down.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def assertSameColumns(result, expected):
+    for column in result.columns:
+        if column not in expected.columns:
+            assert result[column].isna().all(), column
+            continue
+        left = result[column].to_numpy(dtype=object)
+        right = expected[column].to_numpy(dtype=object)
+        missing = pd.isna(left)
+        assert (missing == pd.isna(right)).all(), column
+        assert (left[~missing] == right[~missing]).all(), column
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(
+        f"{'issues':>8} {'normalize':>10} {'peak':>9} {'columns':>8} "
+        f"{'extract':>9} {'peak':>9} {'columns':>8} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        issues = makeRSSIssues(size)
+        expected, normalize_time, normalize_peak = traced(pd.json_normalize, issues)
+        result, extract_time, extract_peak = traced(extractIssues, issues, RSS_SPEC)
+
+        assertSameColumns(result, expected)
+        computed, normalized = computeRSS(result), computeRSS(expected)
+        for column in computed.columns.difference(result.columns):
+            np.testing.assert_array_equal(
+                computed[column].to_numpy(dtype=float),
+                normalized[column].to_numpy(dtype=float),
+                err_msg=column,
+            )
+
+        posts = makePostOTIssues(size)
+        np.testing.assert_array_equal(
+            postOTHours(extractIssues(posts, POST_OT_SPEC)),
+            postOTHours(pd.json_normalize(posts)),
+        )
+
+        print(
+            f"{size:>8} {normalize_time:>9.3f}s {normalize_peak / 2**20:>6.1f}MiB "
+            f"{expected.shape[1]:>8} {extract_time:>8.3f}s {extract_peak / 2**20:>6.1f}MiB "
+            f"{result.shape[1]:>8} {normalize_time / extract_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark and parity check of the RSS OT and work hours: attendance.rssHourTotals
+against the per-day loops (a DataFrame copy and per-element lambdas per day) it replaced.
+
+    python benchmarks/bench_hours.py [--sizes 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import rssHourTotals  # noqa: E402
+from bench_workhours import legacyClamp  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+
+
+def legacyHourTotals(dfRSS2):
+    """
+    The OT and Working Hours loops of main.py before rssHourTotals.
+    """
+    OTHourlist = []
+    for d in range(1, 32):
+        new_dfRSS2 = dfRSS2.copy()
+        D = "D" + str(d)
+        if "properties." + D + "OTTimein" not in new_dfRSS2.columns:
+            continue
+        new_dfRSS2[D + "OTTimein"] = pd.to_datetime(
+            new_dfRSS2["properties." + D + "OTTimein"], format="%H:%M", errors="coerce"
+        )
+        if "properties." + D + "OTTimeOut" not in new_dfRSS2.columns:
+            continue
+        new_dfRSS2[D + "OTTimeOut"] = pd.to_datetime(
+            new_dfRSS2["properties." + D + "OTTimeOut"], format="%H:%M", errors="coerce"
+        )
+        if "properties." + D + "__x0020__OT__x0020__Meal" not in new_dfRSS2.columns:
+            continue
+        new_dfRSS2[D + "OT"] = (
+            (
+                new_dfRSS2[D + "OTTimeOut"].apply(lambda x: x.hour)
+                - new_dfRSS2[D + "OTTimein"].apply(lambda x: x.hour)
+            )
+            + (
+                new_dfRSS2[D + "OTTimeOut"].apply(lambda x: x.minute)
+                - new_dfRSS2[D + "OTTimein"].apply(lambda x: x.minute)
+            )
+            / 60
+            - new_dfRSS2["properties." + D + "__x0020__OT__x0020__Meal"]
+        )
+        new_dfRSS2[D + "OT"] = new_dfRSS2[D + "OT"].apply(lambda x: x + 24 if x < 0 else x)
+        OTHourlist.append(D + "OT")
+        dfRSS2 = new_dfRSS2
+    dfRSS2["Total_x200_Overtime_Hours"] = dfRSS2[OTHourlist].sum(axis=1)
+
+    WorkHourlist = []
+    days = []
+    for d in range(1, 32):
+        new_dfRSS2 = dfRSS2.copy()
+        D = "D" + str(d)
+        if "properties." + D + "__x0020__Time__x0020__In" not in new_dfRSS2.columns:
+            continue
+        new_dfRSS2[D + "__x0020__Time__x0020__In"] = pd.to_datetime(
+            new_dfRSS2["properties." + D + "__x0020__Time__x0020__In"],
+            format="%H:%M",
+            errors="coerce",
+        )
+        if "properties." + D + "__x0020__Time__x0020__Out" not in new_dfRSS2.columns:
+            continue
+        new_dfRSS2[D + "__x0020__Time__x0020__Out"] = pd.to_datetime(
+            new_dfRSS2["properties." + D + "__x0020__Time__x0020__Out"],
+            format="%H:%M",
+            errors="coerce",
+        )
+        new_dfRSS2[D + "_Work_Hour"] = (
+            new_dfRSS2[D + "__x0020__Time__x0020__Out"].apply(lambda x: x.hour)
+            - new_dfRSS2[D + "__x0020__Time__x0020__In"].apply(lambda x: x.hour)
+        ) + (
+            new_dfRSS2[D + "__x0020__Time__x0020__Out"].apply(lambda x: x.minute)
+            - new_dfRSS2[D + "__x0020__Time__x0020__In"].apply(lambda x: x.minute)
+        ) / 60
+        new_dfRSS2[D + "_Work_Hour"] = new_dfRSS2[D + "_Work_Hour"].apply(
+            lambda x: x + 24 if x < 0 else x
+        )
+        WorkHourlist.append(D + "_Work_Hour")
+        days.append(d)
+        dfRSS2 = new_dfRSS2
+    legacyClamp(dfRSS2, days)
+    dfRSS2["Sum_WorkingHours"] = dfRSS2[WorkHourlist].sum(axis=1)
+
+    return dfRSS2
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'per-day loops':>14} {'matrix':>10} {'speedup':>8}")
+    for size in args.sizes:
+        df = pd.json_normalize(makeRSSIssues(size))
+
+        with warnings.catch_warnings():
+            # The legacy loops fragment the frame on purpose
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            expected, legacy_time = timed(legacyHourTotals, df.copy())
+        result, matrix_time = timed(rssHourTotals, df)
+
+        for column in result.columns:
+            np.testing.assert_array_equal(
+                result[column].to_numpy(dtype=float),
+                expected[column].to_numpy(dtype=float),
+                err_msg=column,
+            )
+
+        print(
+            f"{size:>8} {legacy_time:>13.3f}s {matrix_time:>9.4f}s {legacy_time / matrix_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark and parity check of the JSON decoding of large issues pages: jsonutil.loadsFast
+on the response bytes against jsonParser (JsonComment) on the response text.
+
+    python benchmarks/bench_json.py [--sizes 100 1000 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jsonutil  # noqa: E402
+from jsonutil import jsonParser, loadsFast  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+
+
+def issuesPage(size, indent=None):
+    """
+    return: (bytes) an issues page of size RSS Attendance issues with their properties,
+            on one line or pretty-printed with indent
+    """
+    page = {
+        "issues": makeRSSIssues(size),
+        "_links": {"next": {"href": "https://api.bentley.com/issues/?continuationToken=abc"}},
+    }
+    return json.dumps(page, indent=indent).encode()
+
+
+def timed(function, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--indent", type=int, default=None, help="pretty-print the pages")
+    args = parser.parse_args()
+
+    decoder = "orjson" if jsonutil.orjson is not None else jsonutil.json.__name__
+    print(f"fast path decoder: {decoder}")
+    print(
+        f"{'issues':>8} {'MiB':>7} {'jsonParser':>11} {'loadsFast':>10} "
+        f"{'stdlib':>9} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        content = issuesPage(size, args.indent)
+        expected, parser_time = timed(jsonParser, content.decode())
+        result, fast_time = timed(loadsFast, content)
+        _, stdlib_time = timed(json.loads, content)
+
+        assert result == expected
+
+        print(
+            f"{size:>8} {len(content) / 2**20:>7.1f} {parser_time:>10.3f}s "
+            f"{fast_time:>9.3f}s {stdlib_time:>8.3f}s {parser_time / fast_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
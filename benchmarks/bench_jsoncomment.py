@@ -0,0 +1,138 @@
+"""
+Benchmark and parity check of JsonComment on multi-MB JSON with comments: the single pass
+CommentTokenizer against the line based preprocessing it replaced.
+
+    python benchmarks/bench_jsoncomment.py [--sizes 1 4 16] [--chunk 65536]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonutil import CommentTokenizer, JsonComment  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+from tests.test_jsonutil import DIALECT_CASES  # noqa: E402
+
+# Issues per MiB of the pretty-printed document, roughly
+ISSUES_PER_MIB = 130
+
+
+def legacyPreprocess(lines):
+    """
+    The line based JsonComment._preprocess: comments only at line starts, and the trailing
+    commas replaced everywhere, strings included.
+    """
+    standard_json = ""
+    is_multiline = False
+    for line in lines:
+        keep_trail_space = int(line.endswith(" "))
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        if line.startswith(("#", ";", "//")):
+            continue
+        if line.startswith("/*"):
+            is_multiline = True
+        if is_multiline:
+            if line.endswith("*/"):
+                is_multiline = False
+            continue
+        if '"""' in line:
+            line = line.replace('"""', '"')
+        standard_json += line + " " * keep_trail_space
+    standard_json = standard_json.replace(",]", "]")
+    standard_json = standard_json.replace(",}", "}")
+    return standard_json
+
+
+def legacyLoads(text):
+    parser = JsonComment(json)
+    parser.obj = json.loads(legacyPreprocess(text.splitlines()))
+    parser._templatesub(parser.obj)
+    return parser.obj
+
+
+def commentedDocument(mib):
+    """
+    return: (str) a pretty-printed issues document of about mib MiB, with every comment style on
+            their own lines, trailing commas, a long string and a template, all of which the line
+            based preprocessing handles too
+    """
+    issues = makeRSSIssues(max(1, int(mib * ISSUES_PER_MIB)))
+    document = {"issues": issues, "first": "{{/issues/0/id}}"}
+    lines = json.dumps(document, indent=2).splitlines()
+
+    out = ["// Synthetic issues", "/* with comments", "   of every style */", lines[0]]
+    out += ['  "notes": """long strings ', '     span lines""",']
+    for index, line in enumerate(lines[1:], 1):
+        following = lines[index + 1].strip() if index + 1 < len(lines) else ""
+        if following.startswith(("]", "}")) and not line.rstrip().endswith(("[", "{")):
+            line += ","
+        out.append(line)
+        if index % 50 == 0 and line.endswith(","):
+            out.append("  # a comment" if index % 100 else "  ; another comment")
+    return "\n".join(out)
+
+
+def timed(function, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def tokenize(text, chunk):
+    tokenizer = CommentTokenizer()
+    for start in range(0, len(text), chunk):
+        tokenizer.feed(text[start : start + chunk])
+    return tokenizer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunk", type=int, default=1 << 16, help="tokenizer chunk size")
+    args = parser.parse_args()
+
+    print("dialect cases, legacy / tokenizer:")
+    for text, expected in DIALECT_CASES:
+        try:
+            legacy = "ok" if legacyLoads(text) == expected else "wrong"
+        except ValueError:
+            legacy = "error"
+        assert JsonComment(json).loads(text) == expected
+        print(f"  {legacy:>5} / ok    {text!r}")
+
+    print(
+        f"{'MiB':>6} {'legacy pre':>11} {'tokenizer':>10} {'legacy load':>12} "
+        f"{'load':>8} {'load file':>10}"
+    )
+    for mib in args.sizes:
+        text = commentedDocument(mib)
+        expected_json, legacy_time = timed(legacyPreprocess, text.splitlines())
+        standard_json, tokenizer_time = timed(tokenize, text, args.chunk)
+        expected, legacy_load = timed(legacyLoads, text)
+        result, load_time = timed(JsonComment(json).loads, text)
+        from_file, file_time = timed(lambda: JsonComment(json).load(io.StringIO(text)))
+
+        # Same JSON up to the whitespace, and the same objects
+        assert json.loads(standard_json) == json.loads(expected_json)
+        assert result == expected and from_file == expected
+        assert result["first"] == result["issues"][0]["id"]
+
+        print(
+            f"{len(text) / 2**20:>6.1f} {legacy_time:>10.3f}s {tokenizer_time:>9.3f}s "
+            f"{legacy_load:>11.3f}s {load_time:>7.3f}s {file_time:>9.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Memory, time and parity check of the compact attendance model: extraction.extractAttendanceMonth
+and attendance.computeMonth against the extracted dataframe and attendance.computeRSS.
+
+    python benchmarks/bench_model.py [--sizes 1000 10000]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import computeMonth, computeRSS  # noqa: E402
+from extraction import RSS_SPEC, extractAttendanceMonth, extractIssues  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+from writeback import buildRSSPayloads, isSameValue  # noqa: E402
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def modelBytes(month):
+    """
+    return: (int) the bytes of the matrices and of the records with their values, like
+            DataFrame.memory_usage(deep=True) counts the strings of a frame
+    """
+    size = month.nbytes + sys.getsizeof(month.records)
+    for record in month.records:
+        size += sys.getsizeof(record) + sys.getsizeof(record.current)
+        values = [getattr(record, name) for name in record.__slots__[:-1]]
+        values += list(record.current.keys()) + list(record.current.values())
+        size += sum(sys.getsizeof(value) for value in values if value is not None)
+    return size
+
+
+def assertSamePayloads(result, expected):
+    today = datetime.date.today()
+    result, expected = list(buildRSSPayloads(result, today)), list(buildRSSPayloads(expected, today))
+    assert len(result) == len(expected)
+    for left, right in zip(result, expected):
+        assert (left.issueId, left.label) == (right.issueId, right.label)
+        assert left.payload["assignee"] == right.payload["assignee"]
+        for key, value in right.payload["properties"].items():
+            assert isSameValue(left.payload["properties"][key], value), key
+        for key, value in right.current.items():
+            assert isSameValue(left.current[key], value), key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(
+        f"{'issues':>8} {'frame':>10} {'model':>10} {'matrices':>9} {'ratio':>6} "
+        f"{'frame compute':>14} {'model compute':>14}"
+    )
+    for size in args.sizes:
+        issues = makeRSSIssues(size)
+        df = extractIssues(issues, RSS_SPEC)
+        month = extractAttendanceMonth(issues)
+        frame_size = df.memory_usage(deep=True).sum()
+        model_size = modelBytes(month)
+
+        expected, frame_time = timed(computeRSS, df)
+        result, model_time = timed(computeMonth, month)
+
+        for column in result.columns:
+            if column in df.columns:
+                continue
+            np.testing.assert_array_equal(
+                result[column].to_numpy(dtype=float),
+                expected[column].to_numpy(dtype=float),
+                err_msg=column,
+            )
+        assertSamePayloads(result, expected)
+
+        print(
+            f"{size:>8} {frame_size / 2**20:>7.1f}MiB {model_size / 2**20:>7.1f}MiB "
+            f"{month.nbytes / 2**20:>6.1f}MiB {frame_size / model_size:>5.1f}x "
+            f"{frame_time:>13.3f}s {model_time:>13.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
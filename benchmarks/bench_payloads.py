@@ -0,0 +1,106 @@
+"""
+Benchmark and parity check of the RSS update payloads: writeback.buildRSSPayloads
+against the per-field boolean masking (dfRSS2[dfRSS2["id"] == id][...]) it replaced.
+The masking is quadratic, a few hundred issues already take minutes.
+
+    python benchmarks/bench_payloads.py [--sizes 100 300]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import rssHourTotals, rssStatusTotals, tallyStatuses  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+from writeback import RSS_UPDATE_STATUSES, buildRSSPayloads  # noqa: E402
+
+
+def legacyPayloads(dfRSS2, today):
+    """
+    The Update Attendance Form loop of main.py before buildRSSPayloads.
+    """
+    payloads = []
+    for id in dfRSS2["id"]:
+        if dfRSS2["status"].loc[dfRSS2["id"] == id].values[0] not in RSS_UPDATE_STATUSES:
+            continue
+        AddRemarks = {}
+        for Day in range(1, 32):
+            DDay = "D" + str(Day) + "_Work_Hour"
+            if DDay not in dfRSS2.columns:
+                continue
+            if not pd.isnull(dfRSS2[dfRSS2["id"] == id][DDay].values[0]):
+                AddRemarks["D" + str(Day) + "__x0020__Work__x0020__Hour"] = int(
+                    dfRSS2[dfRSS2["id"] == id][DDay].values[0]
+                )
+            else:
+                AddRemarks["D" + str(Day) + "__x0020__Work__x0020__Hour"] = 0
+            if "D" + str(Day) + "OT" in dfRSS2.columns:
+                if not pd.isnull(dfRSS2[dfRSS2["id"] == id]["D" + str(Day) + "OT"].values[0]):
+                    AddRemarks["D" + str(Day) + "__x0020__OT"] = dfRSS2[dfRSS2["id"] == id][
+                        "D" + str(Day) + "OT"
+                    ].values[0]
+        updatejsonload = {
+            "assignee": {
+                "displayName": str(dfRSS2[dfRSS2["id"] == id]["assignee.displayName"].values[0]),
+                "id": str(dfRSS2[dfRSS2["id"] == id]["assignee.id"].values[0]),
+            },
+            "properties": {
+                "Updated__x0020__Date__x0020__By": str(today),
+                "TotalOff": dfRSS2[dfRSS2["id"] == id]["TotalOff"].values[0],
+                "TotalLeaves": dfRSS2[dfRSS2["id"] == id]["TotalLeaves"].values[0],
+                "TotalOtherRemarks": dfRSS2[dfRSS2["id"] == id]["Sum_Others"].values[0],
+                "TotalCovered": dfRSS2[dfRSS2["id"] == id]["TotalCovered"].values[0],
+                "TotalNonCovered": dfRSS2[dfRSS2["id"] == id]["TotalNonCovered"].values[0],
+                "Total__x0020__Working__x0020__Days": str(
+                    dfRSS2[dfRSS2["id"] == id]["Total__x0020__Working__x0020__Days"].values[0]
+                ),
+                "TotalWorkingHours": dfRSS2[dfRSS2["id"] == id]["Sum_WorkingHours"].values[0],
+                "Total__x0020__Overtime__x0020__Hours": dfRSS2[dfRSS2["id"] == id][
+                    "Total_x200_Overtime_Hours"
+                ].values[0],
+            },
+        }
+        updatejsonload["properties"].update(AddRemarks)
+        payloads.append((id, updatejsonload))
+    return payloads
+
+
+def builderPayloads(dfRSS2, today):
+    return [(p.issueId, p.payload) for p in buildRSSPayloads(dfRSS2, today)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    args = parser.parse_args()
+    today = date.today()
+
+    print(f"{'issues':>8} {'masking':>10} {'builder':>10} {'speedup':>8}")
+    for size in args.sizes:
+        df = pd.json_normalize(makeRSSIssues(size))
+        df = df.join(rssStatusTotals(tallyStatuses(df))).join(rssHourTotals(df))
+
+        expected, legacy_time = timed(legacyPayloads, df, today)
+        result, builder_time = timed(builderPayloads, df, today)
+
+        assert result == expected, "payloads differ"
+
+        print(
+            f"{size:>8} {legacy_time:>9.3f}s {builder_time:>9.4f}s {legacy_time / builder_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
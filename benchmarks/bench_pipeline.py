@@ -0,0 +1,377 @@
+"""
+End-to-end benchmark of the RSS Attendance and Post OT pipelines against the mock server,
+at increasing dataset sizes, with a regression gate against a stored baseline.
+
+    python benchmarks/bench_pipeline.py [--sizes 100 1000 10000 50000] [--output results.json]
+                                        [--baseline baseline.json --max-regression 20]
+
+Every size runs in a fresh process against a fresh mock server, in a process of its own,
+so the peak RSS is the one of that size and the server does not compete for the GIL.
+The stages run one after the other to be timed apart: list, details, normalize, tally,
+hours, join, payloads and patch, the pipelines overlap the list and the details.
+Then, in another process against another fresh server, the end_to_end stage times
+AttendanceRun.updateProject, the code main runs, with a state store that skips nothing.
+A size holds that many RSS Attendance Forms and as many Post OT Forms.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+# Stages shorter than this in the baseline are too noisy to gate on
+MIN_SECONDS = 0.05
+
+
+def peakRSS():
+    """
+    return: (float) the peak resident set size of this process so far, in MiB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def serverRequests(session, url):
+    return session.get(f"{url}/__stats").json()["total"]
+
+
+def makeClient(url, args):
+    """
+    return: (bentley.APIClient)client, authenticated at the mock server
+    """
+    from bentley import APIClient, Auth, RateController, TokenProvider
+
+    client = APIClient(
+        base_url=url,
+        pool_size=args.max_concurrency,
+        rate_controller=RateController(
+            initial=args.concurrency, maximum=args.max_concurrency
+        ),
+    )
+    scope = ["itwins:read issues:read issues:modify"]
+    auth = Auth("mock", "mock", scope, client, url=f"{url}/connect/token")
+    client.token_provider = TokenProvider(auth)
+    return client
+
+
+def makeSettings(args):
+    from pipelines import Settings
+    from selection import ProcessingWindow
+
+    return Settings(args.detail_workers, ProcessingWindow(), False, False, args.update_workers)
+
+
+def runSize(size, url, args):
+    """
+    Run the stages of both pipelines against the mock server at url.
+    return: (dict) the seconds, requests and peak RSS of every stage, and their totals
+    """
+    import requests
+
+    from attendance import StageMonitor, computeMonthStages, postOTHours
+    from bentley import (
+        IssuesAPI,
+        TokenBucket,
+        UpdateDispatcher,
+        groupIssueDataDetails,
+        iTwinsAPI,
+    )
+    from extraction import RSS_SPEC, extractAttendanceMonth
+    from pipelines import POST_OT_PROJECT, RSS, AttendanceRun, postOTFrame
+    from writeback import (
+        POST_OT_ELIGIBILITY,
+        RSS_ELIGIBILITY,
+        buildPostOTPayloads,
+        buildRSSPayloads,
+    )
+
+    client = makeClient(url, args)
+    issues_API = IssuesAPI(client)
+    run = AttendanceRun(issues_API, makeSettings(args), None, None, TokenBucket(args.update_rate))
+    today = date.today()
+
+    stats = requests.Session()
+    monitor = StageMonitor()
+    stages = {}
+
+    def timed(name, function, *function_args):
+        before = serverRequests(stats, url)
+        with monitor.stage(name) as record:
+            result = function(*function_args)
+        requests_made = serverRequests(stats, url) - before
+        stages[name] = {
+            "seconds": record["seconds"],
+            "requests": requests_made,
+            "requests_per_second": requests_made / max(record["seconds"], 1e-9),
+            "peak_rss_mib": peakRSS(),
+        }
+        return result
+
+    def listIssueIds(issuetype, rule):
+        return [
+            issue["id"]
+            for page in issues_API.iterProjectIssueData(POST_OT_PROJECT, issuetype)
+            for issue in page
+            if rule.select(issue)
+        ]
+
+    def fetchDetails(issueIds):
+        results = issues_API.iterIssueDataDetails(issueIds, max_workers=args.detail_workers)
+        return [result.content for result in results if result.content is not None]
+
+    def issuesOf(details, issuetype):
+        return groupIssueDataDetails(details)[issuetype]
+
+    def buildPayloads(build, df):
+        return list(build(df, today))
+
+    def patch(issuePayloads):
+        dispatcher = UpdateDispatcher(
+            issues_API, max_workers=args.update_workers, bucket=run.update_bucket
+        )
+        return run.sendUpdates(issuePayloads, dispatcher)
+
+    start = time.perf_counter()
+    timed("token", client.token_provider.authorization)
+    timed("projects", iTwinsAPI(client).getAllProjectsviaiTwins)
+
+    # RSS Attendance Forms
+    issueIds = timed("rss.list", listIssueIds, RSS, RSS_ELIGIBILITY)
+    details = timed("rss.details", fetchDetails, issueIds)
+    month = timed("rss.normalize", extractAttendanceMonth, issuesOf(details, RSS), RSS_SPEC)
+    dfRSS, compute_monitor = computeMonthStages(month)
+    for record in compute_monitor.stages:
+        stages["rss." + record["stage"]] = {
+            "seconds": record["seconds"],
+            "requests": 0,
+            "requests_per_second": 0.0,
+            "peak_rss_mib": peakRSS(),
+        }
+    issuePayloads = timed("rss.payloads", buildPayloads, buildRSSPayloads, dfRSS)
+    rss_summary = timed("rss.patch", patch, issuePayloads)
+    del details, month, dfRSS, issuePayloads
+
+    # Post OT Forms
+    issueIds = timed("post_ot.list", listIssueIds, "Post OT Form", POST_OT_ELIGIBILITY)
+    details = timed("post_ot.details", fetchDetails, issueIds)
+    dfPostOT = timed("post_ot.normalize", postOTFrame, issuesOf(details, "Post OT Form"))
+    dfPostOT["PostOTHour"] = timed("post_ot.hours", postOTHours, dfPostOT)
+    issuePayloads = timed("post_ot.payloads", buildPayloads, buildPostOTPayloads, dfPostOT)
+    post_ot_summary = timed("post_ot.patch", patch, issuePayloads)
+
+    seconds = time.perf_counter() - start
+    requests_made = sum(stage["requests"] for stage in stages.values())
+    client.close()
+    return {
+        "issues": size,
+        "seconds": seconds,
+        "requests": requests_made,
+        "requests_per_second": requests_made / seconds,
+        "peak_rss_mib": peakRSS(),
+        "updated": len(rss_summary["succeeded"]) + len(post_ot_summary["succeeded"]),
+        "failed": len(rss_summary["failed"]) + len(post_ot_summary["failed"]),
+        "stages": stages,
+    }
+
+
+def runEndToEnd(size, url, args):
+    """
+    Run AttendanceRun.updateProject on the project of the mock server, as main does: the
+    prefetched list, the eligibility predicates, the state store, the compute and the updates.
+    return: (dict) the end_to_end stage, like the stages of runSize
+    """
+    import requests
+
+    from bentley import IssuesAPI, TokenBucket, iTwinsAPI
+    from pipelines import AttendanceRun, IssueStateStore, ProjectScheduler
+
+    client = makeClient(url, args)
+    issues_API = IssuesAPI(client)
+    with tempfile.TemporaryDirectory() as directory:
+        # Every issue is processed, and recorded, as on the first run or with FULL_SYNC=1
+        state_store = IssueStateStore(os.path.join(directory, "state.sqlite3"), enabled=False)
+        scheduler = ProjectScheduler(1)
+        run = AttendanceRun(
+            issues_API, makeSettings(args), state_store, scheduler, TokenBucket(args.update_rate)
+        )
+        stats = requests.Session()
+        before = serverRequests(stats, url)
+        start = time.perf_counter()
+        client.token_provider.authorization()
+        (project,) = iTwinsAPI(client).getAllProjectsviaiTwins()
+        counts = run.updateProject(project)
+        seconds = time.perf_counter() - start
+        requests_made = serverRequests(stats, url) - before
+        scheduler.close()
+        state_store.close()
+    client.close()
+    return {
+        "seconds": seconds,
+        "requests": requests_made,
+        "requests_per_second": requests_made / seconds,
+        "peak_rss_mib": peakRSS(),
+        "counts": counts,
+    }
+
+
+def startServer(size, args):
+    """
+    Start the mock server of a size in a process of its own.
+    return: (subprocess.Popen)server, (str)url
+    """
+    command = [
+        sys.executable,
+        os.path.join(HERE, "mock_server.py"),
+        "--port=0",
+        "--projects=1",
+        f"--forms={size}",
+        f"--post-ot-forms={size}",
+        f"--latency={args.latency}",
+        f"--error-rate={args.error_rate}",
+        f"--throttle-rate={args.throttle_rate}",
+        "--retry-after=0.2",
+    ]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line.startswith("Serving"):
+        server.kill()
+        raise RuntimeError(f"The mock server did not start: {line!r}")
+    return server, line.split()[-1]
+
+
+def runWorker(mode, size, args):
+    """
+    Run runSize or runEndToEnd in a fresh worker process against a fresh server.
+    return: (dict) its result
+    """
+    server, url = startServer(size, args)
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "--worker", mode, str(size), url]
+        command += sys.argv[1:]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    finally:
+        server.terminate()
+        server.wait()
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmarkSize(size, args):
+    """
+    return: (dict) the result of runSize, with the end_to_end stage of runEndToEnd
+    """
+    result = runWorker("stages", size, args)
+    result["stages"]["end_to_end"] = runWorker("end_to_end", size, args)
+    return result
+
+
+def regressions(results, baseline, max_regression, min_seconds=MIN_SECONDS):
+    """
+    Compare the stage times with the baseline.
+    return: (list) one message per stage more than max_regression percent slower
+    """
+    messages = []
+    for size, result in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for name, stage in result["stages"].items():
+            before = base["stages"].get(name, {}).get("seconds")
+            if before is None or before < min_seconds:
+                continue
+            change = (stage["seconds"] / before - 1) * 100
+            if change > max_regression:
+                messages.append(
+                    f"{size} issues, {name}: {before:.3f}s -> {stage['seconds']:.3f}s (+{change:.0f}%)"
+                )
+    return messages
+
+
+def printResults(results):
+    for size, result in results["sizes"].items():
+        print(
+            f"{size} issues: {result['seconds']:.2f}s, {result['requests']} requests "
+            f"({result['requests_per_second']:.0f}/s), peak RSS {result['peak_rss_mib']:.0f} MiB, "
+            f"{result['updated']} updated, {result['failed']} failed"
+        )
+        for name, stage in result["stages"].items():
+            rate = f", {stage['requests_per_second']:.0f} requests/s" if stage["requests"] else ""
+            print(f"  {name:<18} {stage['seconds']:>8.3f}s{rate}")
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON file to compare with")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=20.0,
+        help="fail if a stage is more than this percent slower than the baseline",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--detail-workers", type=int, default=16)
+    parser.add_argument("--update-workers", type=int, default=16)
+    parser.add_argument("--update-rate", type=float, default=10000.0)
+    parser.add_argument(
+        "--worker", nargs=3, metavar=("MODE", "SIZE", "URL"), help=argparse.SUPPRESS
+    )
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parseArguments()
+
+    if args.worker:
+        mode, size, url = args.worker
+        worker = runSize if mode == "stages" else runEndToEnd
+        print(json.dumps(worker(int(size), url, args)))
+        return 0
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "worker")
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        results["sizes"][str(size)] = benchmarkSize(size, args)
+    printResults(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        messages = regressions(results, baseline, args.max_regression)
+        for message in messages:
+            print(f"REGRESSION {message}")
+        if messages:
+            return 1
+        print(f"No stage more than {args.max_regression:g}% slower than {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
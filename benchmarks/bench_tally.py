@@ -0,0 +1,106 @@
+"""
+Benchmark of the RSS day status tally: attendance.tallyStatuses against the
+per-label DataFrame.apply chain it replaced.
+
+    python benchmarks/bench_tally.py [--sizes 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import rssStatusTotals, tallyStatuses  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+
+
+def legacyStatusTotals(dfRSS2):
+    """
+    The apply chain of main.py before the tally engine, one row scan per label.
+    """
+
+    def count(label):
+        return dfRSS2.apply(lambda row: sum(row[0 : len(dfRSS2.columns)] == label), axis=1)
+
+    dfRSS2["Sum_FullLeave"] = count("Full Day Leave")
+    dfRSS2["Sum_HalfLeave"] = count("Half Day Leave")
+    dfRSS2["Sum_FullOff"] = count("Full Day Off")
+    dfRSS2["Sum_HalfOff"] = count("Half Day Off")
+    dfRSS2["Sum_Leave"] = dfRSS2["Sum_FullLeave"] + dfRSS2["Sum_HalfLeave"] * 0.5
+    dfRSS2["TotalOff"] = dfRSS2["Sum_FullOff"] + dfRSS2["Sum_HalfOff"] * 0.5
+    dfRSS2["Sum_HalfMC"] = count("Half Day MC")
+    dfRSS2["Sum_FullMC"] = count("Full Day MC")
+    dfRSS2["Sum_Hospitalisation"] = count("Hospitalisation Leave")
+    dfRSS2["Sum_SickLeave"] = (
+        dfRSS2["Sum_FullMC"] + dfRSS2["Sum_HalfMC"] * 0.5 + dfRSS2["Sum_Hospitalisation"]
+    )
+    dfRSS2["TotalLeaves"] = dfRSS2["Sum_SickLeave"] + dfRSS2["Sum_Leave"]
+    dfRSS2["Sum_FullOthers"] = count("Full Day Others")
+    dfRSS2["Sum_HalfOthers"] = count("Half Day Others")
+    dfRSS2["Sum_Others"] = dfRSS2["Sum_FullOthers"] + dfRSS2["Sum_HalfOthers"] * 0.5
+    dfRSS2["TotalFullCovered"] = count("Full Day Cover")
+    dfRSS2["TotalHalfCovered"] = count("Half Day Cover")
+    dfRSS2["TotalCovered"] = dfRSS2["TotalFullCovered"] + dfRSS2["TotalHalfCovered"] * 0.5
+    dfRSS2["TotalNonCovered"] = count("No Cover")
+    dfRSS2["TotalAbsentDays"] = (
+        dfRSS2["TotalOff"] + dfRSS2["Sum_Others"] + dfRSS2["TotalLeaves"]
+    )
+    dfRSS2["TotalHalfCovered"] = count("Half Day Cover")
+    dfRSS2["TotalCovered"] = dfRSS2["TotalFullCovered"] + dfRSS2["TotalHalfCovered"] * 0.5
+    dfRSS2["TotalNonCovered"] = dfRSS2["TotalAbsentDays"] - dfRSS2["TotalCovered"]
+    dfRSS2["Sum_NotAvailable"] = count("Not Available")
+    dfRSS2["Sum_NA"] = count("NA")
+    dfRSS2["Sum_Weekend"] = count("Weekend (Sunday)")
+    dfRSS2["Sum_Public Holiday"] = count("Public Holiday")
+    dfRSS2["Sum_Saturday"] = count("Sat")
+    dfRSS2["Sum_Day"] = 31
+    dfRSS2["Sum_WorkingDays"] = (
+        dfRSS2["Sum_Day"]
+        - dfRSS2["Sum_NotAvailable"]
+        - dfRSS2["Sum_SickLeave"]
+        - dfRSS2["Sum_Others"]
+        - dfRSS2["Sum_Leave"]
+        - dfRSS2["Sum_Public Holiday"]
+        - dfRSS2["Sum_Weekend"]
+        - dfRSS2["Sum_NA"]
+    )
+    dfRSS2["Sum_Day_Month"] = 26
+    dfRSS2["Total__x0020__Working__x0020__Days"] = (
+        dfRSS2["Sum_Day_Month"] - dfRSS2["TotalNonCovered"] - dfRSS2["Sum_NotAvailable"]
+    )
+    return dfRSS2
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'apply chain':>12} {'tally':>10} {'speedup':>8}")
+    for size in args.sizes:
+        df = pd.json_normalize(makeRSSIssues(size))
+
+        legacy, legacy_time = timed(legacyStatusTotals, df.copy())
+        totals, tally_time = timed(lambda: rssStatusTotals(tallyStatuses(df)))
+
+        pd.testing.assert_frame_equal(
+            totals, legacy[totals.columns], check_dtype=False, check_names=False
+        )
+
+        print(
+            f"{size:>8} {legacy_time:>11.3f}s {tally_time:>9.4f}s {legacy_time / tally_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark and parity check of the HH:MM time parsing: attendance.parseHHMMArray
+against pd.to_datetime(format="%H:%M", errors="coerce") with per-element hour and
+minute lambdas.
+
+    python benchmarks/bench_timeparse.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import parseHHMMArray  # noqa: E402
+
+# Malformed entries that must come back as NaN
+MALFORMED = ("24:00", "08:60", " 08:00", "0800", "8", "08:00:00", "", "12:3O", None, np.nan, 7.5)
+
+
+def makeTimes(count, seed=0):
+    rng = random.Random(seed)
+    times = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            times.append(rng.choice(MALFORMED))
+        else:
+            h, m = rng.randrange(24), rng.randrange(0, 60, 5)
+            times.append(rng.choice((f"{h:02d}:{m:02d}", f"{h}:{m:02d}")))
+    return pd.Series(times, dtype=object)
+
+
+def legacyMinutes(times):
+    parsed = pd.to_datetime(times, format="%H:%M", errors="coerce")
+    return (parsed.apply(lambda x: x.hour) * 60 + parsed.apply(lambda x: x.minute)).to_numpy(
+        dtype=float
+    )
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'times':>9} {'to_datetime':>12} {'lookup':>10} {'speedup':>8}")
+    for size in args.sizes:
+        times = makeTimes(size)
+
+        expected, legacy_time = timed(legacyMinutes, times)
+        result, lookup_time = timed(parseHHMMArray, times)
+
+        np.testing.assert_array_equal(result, expected)
+
+        print(
+            f"{size:>9} {legacy_time:>11.3f}s {lookup_time:>9.4f}s {legacy_time / lookup_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
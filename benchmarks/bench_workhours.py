@@ -0,0 +1,99 @@
+"""
+Benchmark and parity check of the RSS work hour rules: attendance.clampWorkHours
+against the per-day iterrows loop it replaced.
+
+    python benchmarks/bench_workhours.py [--sizes 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import clampWorkHours, saturdayOTMask  # noqa: E402
+from synthetic import makeRSSIssues  # noqa: E402
+
+
+def rawWorkHours(df):
+    """
+    The D<day>_Work_Hour columns before the rules, as main.py computes them.
+    """
+    days = []
+    for d in range(1, 32):
+        timein_column = "properties.D" + str(d) + "__x0020__Time__x0020__In"
+        timeout_column = "properties.D" + str(d) + "__x0020__Time__x0020__Out"
+        if timein_column not in df.columns or timeout_column not in df.columns:
+            continue
+        timein = pd.to_datetime(df[timein_column], format="%H:%M", errors="coerce")
+        timeout = pd.to_datetime(df[timeout_column], format="%H:%M", errors="coerce")
+        work = (timeout.dt.hour - timein.dt.hour) + (timeout.dt.minute - timein.dt.minute) / 60
+        df["D" + str(d) + "_Work_Hour"] = work.apply(lambda x: x + 24 if x < 0 else x)
+        days.append(d)
+    return days
+
+
+def legacyClamp(new_dfRSS2, days):
+    """
+    The iterrows loop of main.py before clampWorkHours.
+    """
+    for d in days:
+        remarks_column = "properties.D" + str(d) + "__x002d__Remarks"
+
+        for index, row in new_dfRSS2.iterrows():
+            is_saturday_ot = (
+                (row["properties.D" + str(d) + "__x0020__Day"] == "Sat")
+                and (remarks_column in new_dfRSS2.columns)
+                and (row[remarks_column] == "OT")
+            )
+
+            if is_saturday_ot:
+                new_dfRSS2.at[index, "D" + str(d) + "_Work_Hour"] = 4
+            else:
+                current_value = new_dfRSS2.at[index, "D" + str(d) + "_Work_Hour"]
+                new_dfRSS2.at[index, "D" + str(d) + "_Work_Hour"] = (
+                    8
+                    if current_value > 8
+                    else ((current_value - 1) if current_value > 4 else current_value)
+                )
+    return new_dfRSS2[["D" + str(d) + "_Work_Hour" for d in days]].to_numpy(dtype=float)
+
+
+def vectorizedClamp(df, days):
+    columns = ["D" + str(d) + "_Work_Hour" for d in days]
+    return clampWorkHours(df[columns].to_numpy(dtype=float), saturdayOTMask(df, days))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'iterrows':>10} {'vectorized':>11} {'speedup':>8}")
+    for size in args.sizes:
+        df = pd.json_normalize(makeRSSIssues(size))
+        days = rawWorkHours(df)
+
+        expected, legacy_time = timed(legacyClamp, df.copy(), days)
+        result, vector_time = timed(vectorizedClamp, df, days)
+
+        # Identical, NaN included
+        np.testing.assert_array_equal(result, expected)
+
+        print(
+            f"{size:>8} {legacy_time:>9.3f}s {vector_time:>10.4f}s {legacy_time / vector_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+"""
+Offline stand-in for the Bentley APIs the pipelines use, for load and throughput tests.
+Seeded from the synthetic forms, with configurable latency, errors and throttling.
+
+    python benchmarks/mock_server.py [--projects 3] [--forms 1000] [--latency 0.02]
+                                     [--error-rate 0.01] [--throttle-rate 0.02] [--port 8080]
+
+then run the pipelines against it:
+
+    BENTLEY_API_URL=http://127.0.0.1:8080 BENTLEY_IMS_URL=http://127.0.0.1:8080/connect/token \\
+    CLIENT_ID=mock CLIENT_SECRET=mock FULL_SYNC=1 python main.py all
+
+Endpoints: POST /connect/token, GET /itwins/, GET /issues/ (paged by $top and
+continuationToken, filtered by type, state and status), GET and PATCH /issues/{id},
+GET /issues/formDefinitions, GET /forms/ (paged and filtered like the issues), GET /forms/{id},
+GET /storage/, POST /storage/folders/{id}/folders.
+GET /__stats returns the requests served so far by endpoint and status.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipelines import POST_OT_PROJECT  # noqa: E402
+from synthetic import makePostOTIssues, makeRSSIssues  # noqa: E402
+
+# The fields of the issue and form data lists, the details have every field
+LIST_FIELDS = (
+    "id",
+    "number",
+    "displayName",
+    "type",
+    "state",
+    "status",
+    "createdDateTime",
+    "lastModifiedDateTime",
+)
+
+
+class FaultConfig:
+    """
+    The faults injected into the API responses. The token endpoint is always served.
+    input: (float)latency, The seconds every response is delayed by.
+           (float)jitter, Up to this many more seconds, at random.
+           (float)error_rate, The share of the requests answered 500.
+           (float)throttle_rate, The share of the requests answered 429, with Retry-After.
+           (float)retry_after, The Retry-After seconds of the 429 responses, 0 for none.
+           (int)capacity, The requests served at once, the ones above are answered 429, 0 for no limit.
+           (float)token_ttl, The seconds an access token is valid for. TokenProvider refreshes
+           them 300 seconds ahead, e.g. 310 has it refresh every 10 seconds.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        retry_after=1.0,
+        capacity=0,
+        token_ttl=3600.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.capacity = capacity
+        self.token_ttl = token_ttl
+
+
+class MockDataset:
+    """
+    The projects and forms the server serves.
+    input: (int)projects, The number of projects, the first one POST_OT_PROJECT.
+           (int)forms, The RSS Attendance forms of each project.
+           (int)post_ot_forms, The Post OT forms of POST_OT_PROJECT.
+           (int)seed
+           (int)form_data, The form data instances of the Forms API of each project.
+    """
+
+    def __init__(self, projects=3, forms=1000, post_ot_forms=100, seed=0, form_data=0):
+        self.projects = []
+        self.issues = {}
+        self.form_data = {}
+        # Project ID -> the IDs of its issues and of its form data, in list order
+        self.project_issues = {}
+        self.project_form_data = {}
+        # (kind, project ID, filters) -> the issues or form data of the list, built on the first page
+        self.lists = {}
+        self.lock = threading.Lock()
+
+        for p in range(projects):
+            projectId = POST_OT_PROJECT if p == 0 else f"00000000-0000-0000-0000-{p:012d}"
+            self.projects.append(
+                {
+                    "id": projectId,
+                    "class": "Endeavor",
+                    "subClass": "Project",
+                    "type": None,
+                    "number": f"MOCK {p}",
+                    "displayName": f"Mock Project {p}",
+                    "status": "Active",
+                }
+            )
+            issues = makeRSSIssues(forms, seed=seed + p)
+            if p == 0:
+                issues += makePostOTIssues(post_ot_forms, seed=seed)
+            ids = []
+            for issue in issues:
+                issue["id"] = f"P{p:03d}-{issue['id']}"
+                issue["displayName"] = issue["subject"]
+                self.issues[issue["id"]] = issue
+                ids.append(issue["id"])
+            self.project_issues[projectId] = ids
+
+            # Form data instances have the fields of the issues
+            ids = []
+            for item in makeRSSIssues(form_data, seed=seed + projects + p):
+                item["id"] = f"F{p:03d}-{item['id']}"
+                item["displayName"] = item["subject"]
+                self.form_data[item["id"]] = item
+                ids.append(item["id"])
+            self.project_form_data[projectId] = ids
+
+    def __len__(self):
+        return len(self.issues)
+
+    def listItems(self, kind, projectId, filters):
+        """
+        input: (str)kind, "issues" or "forms".
+        return: (list) the issues or form data of the project matching every filter {field: value}
+        """
+        if kind == "forms":
+            items, project_items = self.form_data, self.project_form_data
+        else:
+            items, project_items = self.issues, self.project_issues
+        key = (kind, projectId, tuple(sorted(filters.items())))
+        with self.lock:
+            listed = self.lists.get(key)
+        if listed is None:
+            listed = [
+                item
+                for item in (items[i] for i in project_items.get(projectId, ()))
+                if all(item.get(field) == value for field, value in filters.items())
+            ]
+            with self.lock:
+                self.lists[key] = listed
+        return listed
+
+    def issueContent(self, issue):
+        """
+        return: (bytes) the issue data details of an issue, not in the middle of an update
+        """
+        with self.lock:
+            return json.dumps({"issue": issue}).encode()
+
+    def updateIssue(self, issue, update):
+        """
+        Apply an update issue data PATCH to an issue.
+        input: (dict)issue
+               (dict)update, The issue fields to set, the properties merged.
+        """
+        with self.lock:
+            for key, value in update.items():
+                if key == "properties":
+                    issue.setdefault("properties", {}).update(value)
+                else:
+                    issue[key] = value
+            issue["lastModifiedDateTime"] = datetime.now(timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+            # The lists filtered by a field that changed are built again
+            if any(key in ("type", "state", "status") for key in update):
+                self.lists.clear()
+
+
+class MockBentleyServer(ThreadingHTTPServer):
+    """
+    The mock server, one thread per request.
+    input: (MockDataset)dataset
+           (FaultConfig)faults
+           (tuple)address, (host, port), port 0 picks a free one.
+           (int)page_size, The issues of a list page when $top is not given.
+           (int)seed, Of the injected faults.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, dataset, faults=None, address=("127.0.0.1", 0), page_size=100, seed=0):
+        super().__init__(address, MockBentleyHandler)
+        self.dataset = dataset
+        self.faults = faults or FaultConfig()
+        self.page_size = page_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.tokens = {}
+        # (method, endpoint, status) -> requests, and the bytes received and sent
+        self.stats = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_url(self):
+        return f"{self.url}/connect/token"
+
+    def environment(self):
+        """
+        return: (dict) the environment variables that point main.py at this server
+        """
+        return {
+            "BENTLEY_API_URL": self.url,
+            "BENTLEY_IMS_URL": self.token_url,
+            "CLIENT_ID": "mock",
+            "CLIENT_SECRET": "mock",
+        }
+
+    def start(self):
+        """
+        Serve in a background thread.
+        return: (MockBentleyServer) self
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def fault(self):
+        """
+        Draw the fault of a request, once it is counted in flight.
+        return: (int)status, 429 or 500 for an injected fault, None to serve the request
+        """
+        faults = self.faults
+        with self.lock:
+            if faults.capacity and self.inflight > faults.capacity:
+                return 429
+            draw = self.random.random()
+        if draw < faults.throttle_rate:
+            return 429
+        if draw < faults.throttle_rate + faults.error_rate:
+            return 500
+        return None
+
+    def delay(self):
+        faults = self.faults
+        seconds = faults.latency
+        if faults.jitter:
+            with self.lock:
+                seconds += self.random.uniform(0, faults.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def issueToken(self):
+        with self.lock:
+            token = f"mock-{len(self.tokens)}-{self.random.getrandbits(32):08x}"
+            self.tokens[token] = time.time() + self.faults.token_ttl
+        return token
+
+    def isAuthorized(self, authorization):
+        token = (authorization or "").partition(" ")[2]
+        with self.lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def snapshot(self):
+        """
+        return: (dict) the requests served by "METHOD endpoint" and status, and the bytes
+        """
+        with self.lock:
+            requests = {}
+            for (method, endpoint, status), count in sorted(self.stats.items()):
+                statuses = requests.setdefault(f"{method} {endpoint}", {})
+                statuses[str(status)] = count
+            return {
+                "requests": requests,
+                "total": sum(self.stats.values()),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "issues": len(self.dataset),
+            }
+
+
+class MockBentleyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written apart, without it each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def handle_request(self, method):
+        server = self.server
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        endpoint = "/" + (segments[0] if segments else "")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if endpoint == "/__stats":
+            self.respond(200, server.snapshot())
+            return
+
+        with server.lock:
+            server.inflight += 1
+            server.bytes_in += length
+        try:
+            server.delay()
+            status = None if endpoint == "/connect" else server.fault()
+            if status == 429:
+                headers = {}
+                if server.faults.retry_after:
+                    headers["Retry-After"] = f"{server.faults.retry_after:g}"
+                status = self.respond(429, {"error": {"code": "TooManyRequests"}}, headers)
+            elif status == 500:
+                status = self.respond(500, {"error": {"code": "InternalServerError"}})
+            elif endpoint == "/connect" and segments[1:] == ["token"] and method == "POST":
+                status = self.respond(
+                    200,
+                    {
+                        "access_token": server.issueToken(),
+                        "token_type": "Bearer",
+                        "expires_in": int(server.faults.token_ttl),
+                    },
+                )
+            elif not server.isAuthorized(self.headers.get("Authorization")):
+                status = self.respond(401, {"error": {"code": "HeaderNotFound"}})
+            else:
+                status = self.route(method, endpoint, segments, query, body)
+        finally:
+            with server.lock:
+                server.inflight -= 1
+        with server.lock:
+            server.stats[(method, endpoint, status)] += 1
+
+    def route(self, method, endpoint, segments, query, body):
+        """
+        Serve an authorized request.
+        return: (int)status
+        """
+        dataset = self.server.dataset
+
+        if endpoint == "/itwins" and method == "GET":
+            return self.respond(200, {"iTwins": dataset.projects, "_links": {}})
+
+        if endpoint == "/issues" and len(segments) == 1 and method == "GET":
+            return self.listPage("issues", "issues", query)
+
+        if endpoint == "/issues" and segments[1:] == ["formDefinitions"]:
+            return self.respond(200, {"formDefinitions": [], "_links": {}})
+
+        if endpoint == "/issues" and len(segments) == 2:
+            issue = dataset.issues.get(segments[1])
+            if issue is None:
+                return self.respond(404, {"error": {"code": "IssueNotFound"}})
+            if method == "GET":
+                return self.respond(200, dataset.issueContent(issue))
+            if method == "PATCH":
+                return self.patchIssue(issue, body)
+
+        if endpoint == "/forms" and len(segments) == 1 and method == "GET":
+            return self.listPage("forms", "formDataInstances", query)
+
+        if endpoint == "/forms" and len(segments) == 2 and method == "GET":
+            item = dataset.form_data.get(segments[1])
+            if item is None:
+                return self.respond(404, {"error": {"code": "FormDataNotFound"}})
+            return self.respond(200, {"formData": item})
+
+        if endpoint == "/storage" and len(segments) == 1 and method == "GET":
+            return self.respond(200, {"items": [], "_links": {}})
+
+        if endpoint == "/storage" and segments[-1:] == ["folders"] and method == "POST":
+            folder = json.loads(body or b"{}")
+            folder["id"] = f"folder-{self.server.random.getrandbits(32):08x}"
+            return self.respond(201, {"folder": folder})
+
+        return self.respond(404, {"error": {"code": "NotFound"}})
+
+    def listPage(self, kind, name, query):
+        """
+        Serve a page of the issue or form data list, with the next page in _links.
+        input: (str)kind, "issues" or "forms", the endpoint.
+               (str)name, The key of the page in the response.
+        return: (int)status
+        """
+        server = self.server
+        filters = {
+            field: query[field] for field in ("type", "state", "status") if field in query
+        }
+        items = server.dataset.listItems(kind, query.get("projectId"), filters)
+        start = int(query.get("continuationToken", 0))
+        top = int(query.get("$top", server.page_size))
+        page = [
+            {field: item[field] for field in LIST_FIELDS if field in item}
+            for item in items[start : start + top]
+        ]
+
+        links = {"self": {"href": server.url + self.path}}
+        if start + top < len(items):
+            next_query = dict(query, continuationToken=start + top)
+            links["next"] = {"href": f"{server.url}/{kind}/?{urlencode(next_query)}"}
+        return self.respond(200, {name: page, "_links": links})
+
+    def patchIssue(self, issue, body):
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return self.respond(422, {"error": {"code": "InvalidIssueRequest"}})
+
+        dataset = self.server.dataset
+        dataset.updateIssue(issue, update)
+        return self.respond(200, dataset.issueContent(issue))
+
+    def respond(self, status, content, headers=None):
+        """
+        Send a JSON response.
+        input: (int)status
+               (dict or bytes)content
+               (dict)headers, More headers.
+        return: (int)status
+        """
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+        with self.server.lock:
+            self.server.bytes_out += len(content)
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--forms", type=int, default=1000, help="RSS forms per project")
+    parser.add_argument("--post-ot-forms", type=int, default=100)
+    parser.add_argument(
+        "--form-data", type=int, default=100, help="form data instances per project"
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to as many more seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--capacity", type=int, default=0, help="requests served at once")
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    args = parser.parse_args()
+
+    dataset = MockDataset(
+        args.projects, args.forms, args.post_ot_forms, args.seed, args.form_data
+    )
+    faults = FaultConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        capacity=args.capacity,
+        token_ttl=args.token_ttl,
+    )
+    server = MockBentleyServer(
+        dataset, faults, (args.host, args.port), page_size=args.page_size, seed=args.seed
+    )
+    print(f"Serving {len(dataset)} issues of {args.projects} projects on {server.url}", flush=True)
+    for name, value in server.environment().items():
+        print(f"  {name}={value}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Synthetic RSS Attendance V1 and Post OT Form issue data details for the benchmarks.
+The issues have the shape of the "issue" of IssuesAPI.getIssueDataDetails.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Weekend (Sunday)")
+
+# Day statuses, with "Present" standing in for a normal working day
+DAY_STATUSES = (
+    ("Present", 70),
+    ("Full Day Leave", 3),
+    ("Half Day Leave", 2),
+    ("Full Day Off", 2),
+    ("Half Day Off", 1),
+    ("Full Day MC", 2),
+    ("Half Day MC", 1),
+    ("Hospitalisation Leave", 1),
+    ("Full Day Others", 1),
+    ("Half Day Others", 1),
+    ("Full Day Cover", 2),
+    ("Half Day Cover", 1),
+    ("No Cover", 1),
+    ("Not Available", 2),
+    ("NA", 2),
+)
+
+RSS_STATUSES = (
+    "Assigned to RSS",
+    "Send to Main Contractor For Verification",
+    "Send to Consultant For Verification",
+    "Send to JTC For Verification",
+    "Send to Lead RSS For Verification",
+    "Closed",
+)
+
+# Unrelated properties, to make the frame as wide as the real forms
+EXTRA_PROPERTIES = 60
+
+
+def hhmm(minutes):
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def issueHeader(rng, index, issuetype, prefix, start):
+    created = start + timedelta(days=rng.randrange(365), seconds=rng.randrange(86400))
+    modified = created + timedelta(days=rng.randrange(30))
+    return {
+        "id": f"{prefix}-{index:08d}",
+        "number": f"{prefix}-{index}",
+        "type": issuetype,
+        "subject": f"{issuetype} {index}",
+        "state": rng.choice(("Open", "Open", "Open", "Closed")),
+        "createdDateTime": created.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "lastModifiedDateTime": modified.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "assignee": {"displayName": f"RSS Officer {index % 97}", "id": f"user-{index % 97}"},
+        "createdBy": {"displayName": f"RSS Officer {index % 97}", "id": f"user-{index % 97}"},
+        "location": {"x": rng.random(), "y": rng.random(), "z": 0.0},
+        "attachments": [{"id": f"{prefix}-{index}-{a}", "fileName": f"photo{a}.jpg"} for a in range(rng.randrange(3))],
+        "_links": {
+            "self": {"href": f"https://api.bentley.com/issues/{prefix}-{index:08d}"},
+            "project": {"href": "https://api.bentley.com/projects/00000000"},
+        },
+    }
+
+
+def makeRSSIssue(rng, index, start=datetime(2024, 1, 1, tzinfo=timezone.utc)):
+    """
+    Make one RSS Attendance V1 issue with 31 days of statuses and times.
+    """
+    issue = issueHeader(rng, index, "RSS Attendance V1", "RSS", start)
+    issue["status"] = rng.choice(RSS_STATUSES)
+
+    statuses, weights = zip(*DAY_STATUSES)
+    properties = {}
+    first = rng.randrange(7)
+    for d in range(1, 32):
+        day = DAY_NAMES[(first + d) % 7]
+        if rng.random() < 0.03:
+            day = "Public Holiday"
+        properties[f"D{d}__x0020__Day"] = day
+        status = rng.choices(statuses, weights)[0]
+        properties[f"D{d}__x0020__Attendance"] = status
+
+        ot = rng.random() < 0.2
+        properties[f"D{d}__x002d__Remarks"] = "OT" if ot else ""
+
+        if status == "Present" and day != "Weekend (Sunday)" and rng.random() < 0.95:
+            timein = rng.randrange(6 * 60, 10 * 60, 15)
+            if rng.random() < 0.05:
+                # Night shift, ends the next day
+                timein = rng.randrange(19 * 60, 22 * 60, 15)
+            timeout = timein + rng.randrange(3 * 60, 12 * 60, 5)
+            properties[f"D{d}__x0020__Time__x0020__In"] = hhmm(timein)
+            properties[f"D{d}__x0020__Time__x0020__Out"] = hhmm(timeout)
+            if rng.random() < 0.02:
+                properties[f"D{d}__x0020__Time__x0020__Out"] = "25:99"
+
+            if ot:
+                properties[f"D{d}OTTimein"] = hhmm(timeout)
+                properties[f"D{d}OTTimeOut"] = hhmm(timeout + rng.randrange(30, 6 * 60, 15))
+                # Meals that are not a whole number of minutes too
+                properties[f"D{d}__x0020__OT__x0020__Meal"] = rng.choice((0, 0.5, 1, 0.33, 1 / 3))
+
+    for k in range(EXTRA_PROPERTIES):
+        properties[f"Field{k}"] = rng.choice(("", "Yes", "No", str(k)))
+
+    issue["properties"] = properties
+    return issue
+
+
+def makePostOTIssue(rng, index, start=datetime(2024, 1, 1, tzinfo=timezone.utc)):
+    """
+    Make one Post OT Form issue.
+    """
+    issue = issueHeader(rng, index, "Post OT Form", "POT", start)
+    timein = rng.randrange(17 * 60, 23 * 60, 15)
+    issue["properties"] = {
+        "ActualOTStart": hhmm(timein),
+        "ActualOTEnd": hhmm(timein + rng.randrange(30, 8 * 60, 15)),
+        "RSSMeal1": rng.choice((0, 0.5, 1)),
+    }
+    return issue
+
+
+def makeRSSIssues(count, seed=0):
+    rng = random.Random(seed)
+    return [makeRSSIssue(rng, index) for index in range(count)]
+
+
+def makePostOTIssues(count, seed=0):
+    rng = random.Random(seed)
+    return [makePostOTIssue(rng, index) for index in range(count)]
@@ -0,0 +1,1709 @@
+"""
+Clients of the Bentley APIs: the HTTP client shared by every API with its rate control and
+circuit breakers, the IMS authentication, the iTwins, Forms, Issues and Storage APIs, and the
+dispatcher of the issue updates. Importing it makes no request.
+"""
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+import hashlib
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from jsonutil import decodeResponse
+
+logger = logging.getLogger(__name__)
+
+
+def groupFormDataDetails(list_formDataInstances):
+    groupLists_formDataInstances = defaultdict(list)
+
+    for formDataInstance in list_formDataInstances:
+        # logger.info(formDataInstance)
+        # break
+        groupLists_formDataInstances[formDataInstance["formData"]["type"]].append(
+            formDataInstance["formData"]
+        )
+
+    return groupLists_formDataInstances
+
+
+def groupIssueDataDetails(list_issueDataInstances):
+    groupLists_issueDataInstances = defaultdict(list)
+
+    for issues in list_issueDataInstances:
+        # logger.info(formDataInstance)
+        # break
+        groupLists_issueDataInstances[issues["issue"]["type"]].append(issues["issue"])
+
+    return groupLists_issueDataInstances
+
+
+def prefetch(iterable, depth=2, poll=0.1):
+    """
+    Run an iterator in a background thread so its next items are produced
+    while the caller is still busy with the current one.
+    When the caller stops early, by an exception or by closing the generator, the thread
+    stops within poll seconds and closes the iterator, instead of blocking on a full buffer.
+    input: (iterable)iterable, e.g. the pages of IssuesAPI.iterProjectIssueData.
+           (int)depth, The maximum number of items buffered ahead.
+           (float)poll, The seconds between the checks of a full buffer for a stop.
+    return: (generator) the items of iterable, re-raising its exception if it fails.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry):
+        # False once the caller has stopped
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=poll)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((done, e))
+        else:
+            put((done, None))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def errorhandler(function, errorMessage):
+    logger.error(function + " " + errorMessage)
+    exit(1)
+
+
+class APIError(Exception):
+    def __init__(self, function, status_code):
+        super().__init__(f"{function} failed {status_code}")
+        self.function = function
+        self.status_code = status_code
+
+
+# One entry per requested issue of IssuesAPI.getIssueDataDetailsBatch
+# content is None and error is set when the fetch failed
+IssueDetailResult = namedtuple("IssueDetailResult", ["issueId", "content", "error"])
+
+
+### Client
+API_BASE_URL = "https://api.bentley.com"
+IMS_TOKEN_URL = "https://ims.bentley.com/connect/token"
+
+# (connect, read) timeouts in seconds, keyed by the first segment of the URL path
+DEFAULT_TIMEOUTS = {
+    "connect": (5, 30),
+    "itwins": (5, 30),
+    "forms": (5, 60),
+    "issues": (5, 60),
+    "storage": (5, 120),
+}
+DEFAULT_TIMEOUT = (5, 60)
+
+
+def retryAfterSeconds(response):
+    """
+    Get the delay requested by a Retry-After header.
+    input: (requests.Response)response
+    return: (float)seconds, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoffSeconds(attempt, base=0.5, cap=30.0):
+    """
+    Full-jitter exponential backoff delay for a retry attempt (0-based).
+    return: (float)seconds
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+# Methods that are safe to send again after a 5xx or a transport error
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"{endpoint} circuit open, retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one endpoint. Opened by threshold failures in a row, the requests
+    to the endpoint then fail fast for cooldown seconds, after which a single trial request
+    is let through: its success closes the circuit, its failure opens it again.
+    input: (int)threshold, The failures in a row that open the circuit.
+           (float)cooldown, The seconds the circuit stays open.
+    """
+
+    def __init__(self, threshold=10, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def allow(self):
+        """
+        return: (bool) whether a request may be sent now
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial or time.monotonic() < self.opened_at + self.cooldown:
+                return False
+            self.trial = True
+            return True
+
+    def retryIn(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def record(self, succeeded):
+        """
+        Record the outcome of a request that was allowed.
+        return: (bool) True if this failure opened the circuit
+        """
+        with self.lock:
+            self.trial = False
+            if succeeded:
+                self.failures = 0
+                self.opened_at = None
+                return False
+            self.failures += 1
+            if self.failures >= self.threshold:
+                opened = self.opened_at is None
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+
+class RateController:
+    """
+    Adaptive limit of the requests in flight to the APIs, shared by every API class
+    through the APIClient.
+    The limit grows by 1 / limit on every success, about one per round trip of the
+    whole limit, and is halved by a 429 or 503 of a request sent after the last decrease,
+    so a burst of throttled responses halves it once.
+    A Retry-After pauses every request for that long. Throttled (429, 503) requests are
+    retried for every method, 5xx and transport errors for the idempotent ones only,
+    with jittered exponential backoff. Each endpoint has its own CircuitBreaker.
+    input: (int)initial, (int)minimum, (int)maximum, The limit of requests in flight.
+           (int)max_retries, The number of retries after the first attempt.
+           (int)failure_threshold, (float)cooldown, See CircuitBreaker.
+    """
+
+    def __init__(
+        self,
+        initial=16,
+        minimum=1,
+        maximum=64,
+        max_retries=5,
+        failure_threshold=10,
+        cooldown=30.0,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.condition = threading.Condition()
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.breakers = {}
+
+    def breaker(self, endpoint):
+        with self.condition:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            return self.breakers[endpoint]
+
+    def acquire(self):
+        """
+        Block until a request may be sent, and count it in flight.
+        return: (float)started, The time it was let through, for release.
+        """
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0 and self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return now
+                self.condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, started, response=None):
+        """
+        Count a request out of flight and adapt the limit to its response.
+        input: (float)started, The time returned by acquire.
+               (requests.Response)response, None after a transport error.
+        """
+        with self.condition:
+            self.inflight -= 1
+            status_code = response.status_code if response is not None else None
+            if status_code in (429, 503):
+                now = time.monotonic()
+                if started >= self.last_decrease:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.last_decrease = now
+                    logger.info(
+                        f"Throttled ({status_code}), {int(self.limit)} requests in flight at most"
+                    )
+                delay = retryAfterSeconds(response)
+                if delay:
+                    self.paused_until = max(self.paused_until, now + delay)
+            elif status_code is not None and status_code < 500:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def call(self, endpoint, method, send):
+        """
+        Send a request through the limit, the retries and the circuit breaker of its endpoint.
+        input: (str)endpoint, The key of the circuit breaker.
+               (str)method, The HTTP method, to know whether it may be sent again.
+               (callable)send, Sends the request once and returns its response.
+        return: (requests.Response)response, the last one if every retry failed.
+        raise: CircuitOpenError if the circuit of the endpoint is open,
+               requests.RequestException if the last attempt failed to send.
+        """
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(endpoint, breaker.retryIn())
+
+            started = self.acquire()
+            response = error = None
+            try:
+                response = send()
+            except requests.RequestException as e:
+                error = e
+            finally:
+                self.release(started, response)
+
+            throttled = response is not None and response.status_code in (429, 503)
+            failed = error is not None or (response.status_code >= 500 and not throttled)
+            if breaker.record(not failed):
+                logger.error(f"{endpoint} failing, circuit open for {breaker.cooldown:.0f}s")
+
+            retry = throttled or (failed and method.upper() in IDEMPOTENT_METHODS)
+            if not retry or attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = retryAfterSeconds(response) if throttled else None
+            if delay is None:
+                delay = backoffSeconds(attempt)
+            time.sleep(delay)
+            attempt += 1
+
+
+# Upper bounds in seconds of the latency histogram buckets, the last one is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segments of the Bentley APIs, the other segments are IDs and are reported as {id}
+ROUTE_SEGMENTS = frozenset(
+    (
+        "connect",
+        "token",
+        "itwins",
+        "forms",
+        "issues",
+        "storage",
+        "formDefinitions",
+        "attachments",
+        "storageExport",
+        "folders",
+    )
+)
+
+METRICS_PREFIX = "bentley_api"
+
+
+def bucketQuantile(quantile, counts, maximum, buckets=LATENCY_BUCKETS):
+    """
+    Estimate a quantile of a latency histogram by linear interpolation in its bucket,
+    as the Prometheus histogram_quantile does.
+    input: (float)quantile, e.g. 0.95
+           (list)counts, The observations of every bucket, the +Inf one last.
+           (float)maximum, The largest observation, the estimate of the +Inf bucket.
+    return: (float)seconds, or None without observations.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = quantile * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if index == len(buckets):
+                return maximum
+            lower = buckets[index - 1] if index else 0.0
+            estimate = lower + (buckets[index] - lower) * (rank - seen) / count
+            return min(estimate, maximum)
+        seen += count
+    return maximum
+
+
+def prometheusLabels(**labels):
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class RequestMetrics:
+    """
+    Metrics of the requests of an APIClient, per route and method: the calls, the
+    responses by status ("error" for the transport errors), the retries, the circuit
+    breaker rejections, the bytes received and sent, the latency histogram of every
+    attempt and the seconds of the calls, retries and waits for the rate limit included.
+    Dumped at the end of a run as a Prometheus textfile and a JSON summary.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.created = time.time()
+        self.endpoints = {}
+
+    def stats(self, route, method):
+        # Called with the lock held
+        key = (route, method)
+        if key not in self.endpoints:
+            self.endpoints[key] = {
+                "calls": 0,
+                "statuses": defaultdict(int),
+                "retries": 0,
+                "circuit_rejections": 0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "latency_counts": [0] * (len(LATENCY_BUCKETS) + 1),
+                "latency_sum": 0.0,
+                "latency_max": 0.0,
+                "call_seconds": 0.0,
+            }
+        return self.endpoints[key]
+
+    def observe(self, route, method, status, seconds, bytes_in=0, bytes_out=0):
+        """
+        Record one attempt of a request.
+        input: (str)route, (str)method
+               (int)status, The status code of the response, or "error".
+               (float)seconds, The time until the response was read.
+               (int)bytes_in, (int)bytes_out, The bodies of the response and of the request.
+        """
+        bucket = len(LATENCY_BUCKETS)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                bucket = index
+                break
+        with self.lock:
+            stats = self.stats(route, method)
+            stats["statuses"][str(status)] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["latency_counts"][bucket] += 1
+            stats["latency_sum"] += seconds
+            stats["latency_max"] = max(stats["latency_max"], seconds)
+
+    @contextmanager
+    def call(self, route, method):
+        """
+        Record a request through all its attempts.
+        yield: (callable)track, Wraps the function sending the request once, so that
+               each of its attempts is observed. The attempts after the first are retries.
+        """
+        attempts = 0
+
+        def track(send):
+            def tracked():
+                nonlocal attempts
+                attempts += 1
+                start = time.perf_counter()
+                try:
+                    response = send()
+                except requests.RequestException:
+                    self.observe(route, method, "error", time.perf_counter() - start)
+                    raise
+                seconds = time.perf_counter() - start
+                body = response.request.body if response.request is not None else None
+                # The bodies passed as str through data= are sent in UTF-8
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.observe(
+                    route,
+                    method,
+                    response.status_code,
+                    seconds,
+                    len(response.content or b""),
+                    len(body or b""),
+                )
+                return response
+
+            return tracked
+
+        start = time.perf_counter()
+        rejected = False
+        try:
+            yield track
+        except CircuitOpenError:
+            rejected = True
+            raise
+        finally:
+            with self.lock:
+                stats = self.stats(route, method)
+                stats["calls"] += 1
+                stats["retries"] += max(0, attempts - 1)
+                stats["circuit_rejections"] += rejected
+                stats["call_seconds"] += time.perf_counter() - start
+
+    def summary(self):
+        """
+        return: (dict)summary, The metrics of every route and method, the ones that took
+                the most time first, with their p50, p95 and p99 latencies in seconds.
+        """
+        with self.lock:
+            endpoints = [
+                (route, method, dict(stats, statuses=dict(sorted(stats["statuses"].items()))))
+                for (route, method), stats in self.endpoints.items()
+            ]
+        rows = []
+        for route, method, stats in endpoints:
+            counts = stats["latency_counts"]
+            attempts = sum(counts)
+            rows.append(
+                {
+                    "route": route,
+                    "method": method,
+                    "calls": stats["calls"],
+                    "attempts": attempts,
+                    "retries": stats["retries"],
+                    "circuit_rejections": stats["circuit_rejections"],
+                    "statuses": stats["statuses"],
+                    "bytes_in": stats["bytes_in"],
+                    "bytes_out": stats["bytes_out"],
+                    "call_seconds": stats["call_seconds"],
+                    "latency": {
+                        "sum": stats["latency_sum"],
+                        "mean": stats["latency_sum"] / attempts if attempts else None,
+                        "p50": bucketQuantile(0.50, counts, stats["latency_max"]),
+                        "p95": bucketQuantile(0.95, counts, stats["latency_max"]),
+                        "p99": bucketQuantile(0.99, counts, stats["latency_max"]),
+                        "max": stats["latency_max"] if attempts else None,
+                        "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], counts)),
+                    },
+                }
+            )
+        rows.sort(key=lambda row: row["call_seconds"], reverse=True)
+        return {
+            "started": datetime.fromtimestamp(self.created, timezone.utc).isoformat(),
+            "seconds": time.time() - self.created,
+            "endpoints": rows,
+        }
+
+    def prometheus(self):
+        """
+        return: (str) the metrics in the Prometheus text exposition format
+        """
+        summary = self.summary()
+        families = (
+            ("calls_total", "counter", "Requests made to the API, retries not included."),
+            ("responses_total", "counter", "Attempts of the requests by status."),
+            ("retries_total", "counter", "Attempts sent again after a failure or a 401."),
+            ("circuit_rejections_total", "counter", "Requests failed fast by an open circuit."),
+            ("received_bytes_total", "counter", "Bytes of the response bodies."),
+            ("sent_bytes_total", "counter", "Bytes of the request bodies."),
+            ("call_seconds_total", "counter", "Time of the requests, retries and waits included."),
+            ("request_duration_seconds", "histogram", "Latency of every attempt."),
+        )
+        # The (suffix, labels, value) of every sample, by metric
+        samples = {name: [] for name, _, _ in families}
+        for row in summary["endpoints"]:
+            labels = {"route": row["route"], "method": row["method"]}
+            for name, key in (
+                ("calls_total", "calls"),
+                ("retries_total", "retries"),
+                ("circuit_rejections_total", "circuit_rejections"),
+                ("received_bytes_total", "bytes_in"),
+                ("sent_bytes_total", "bytes_out"),
+                ("call_seconds_total", "call_seconds"),
+            ):
+                samples[name].append(("", labels, row[key]))
+            for status, count in sorted(row["statuses"].items()):
+                samples["responses_total"].append(("", dict(labels, status=status), count))
+
+            histogram = samples["request_duration_seconds"]
+            cumulative = 0
+            for bound, count in row["latency"]["buckets"].items():
+                cumulative += count
+                histogram.append(("_bucket", dict(labels, le=bound), cumulative))
+            histogram.append(("_sum", labels, row["latency"]["sum"]))
+            histogram.append(("_count", labels, row["attempts"]))
+
+        lines = []
+        for name, kind, help in families:
+            metric = f"{METRICS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for suffix, labels, value in samples[name]:
+                lines.append(f"{metric}{suffix}{prometheusLabels(**labels)} {value!r}")
+        metric = f"{METRICS_PREFIX}_last_run_timestamp_seconds"
+        lines.append(f"# HELP {metric} End of the last run.")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, prometheus_path=None, json_path=None):
+        """
+        Write the Prometheus textfile and the JSON summary, each replaced at once so that
+        a collector never reads half a file.
+        input: (str)prometheus_path, (str)json_path, None to not write that one.
+        """
+        outputs = []
+        if prometheus_path:
+            outputs.append((prometheus_path, self.prometheus()))
+        if json_path:
+            outputs.append((json_path, json.dumps(self.summary(), indent=2)))
+        for path, text in outputs:
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf8") as f:
+                f.write(text)
+            os.replace(temporary, path)
+
+
+def logMetricsSummary(metrics, limit=10):
+    """
+    Log the routes that took the most time, with their calls, statuses and latencies.
+    input: (RequestMetrics)metrics
+           (int)limit, The number of routes logged.
+    """
+    summary = metrics.summary()
+    for row in summary["endpoints"][:limit]:
+        statuses = ", ".join(f"{count} {status}" for status, count in row["statuses"].items())
+        latency = row["latency"]
+        percentiles = (
+            f"p50 {latency['p50'] * 1000:.0f}ms, p95 {latency['p95'] * 1000:.0f}ms, "
+            f"p99 {latency['p99'] * 1000:.0f}ms"
+            if row["attempts"]
+            else "no response"
+        )
+        logger.info(
+            f"{row['method']} {row['route']} - {row['calls']} calls, {row['call_seconds']:.1f}s in all, "
+            f"{row['retries']} retries, {statuses or 'no status'}, {percentiles}, "
+            f"{row['bytes_in'] / 2**20:.1f} MiB in, {row['bytes_out'] / 2**20:.1f} MiB out"
+        )
+    calls = sum(row["calls"] for row in summary["endpoints"])
+    logger.info(f"{calls} API calls in {len(summary['endpoints'])} routes")
+
+
+class APIClient:
+    """
+    Shared HTTP client for all the API wrappers.
+    Keeps one keep-alive connection pool to api.bentley.com so the detail GETs and PATCHes
+    reuse connections instead of paying a TCP+TLS handshake per request.
+    input: (str)authorization_key, A fixed bearer token sent in the Authorization header.
+           (int)pool_size, The maximum number of pooled connections per host, defaults to the
+           maximum of requests in flight of the rate controller, so that no connection is
+           discarded when it is reached.
+           (dict)timeouts, Overrides of DEFAULT_TIMEOUTS, e.g. {"issues": (5, 30)}.
+           (TokenProvider)token_provider, Gives the Authorization header of every request
+           to the API instead, refreshed as the token expires.
+           (RateController)rate_controller, Limits and retries every request, defaults
+           to a RateController of its own.
+           (str)base_url, The root of the APIs, e.g. a mock server for load tests.
+           (RequestMetrics)metrics, Records every request, defaults to metrics of its own.
+    """
+
+    def __init__(
+        self,
+        authorization_key=None,
+        pool_size=None,
+        timeouts=None,
+        token_provider=None,
+        rate_controller=None,
+        base_url=API_BASE_URL,
+        metrics=None,
+    ):
+        self.authorization_key = authorization_key
+        self.token_provider = token_provider
+        self.rate_controller = rate_controller or RateController()
+        self.base_url = base_url.rstrip("/")
+        self.metrics = metrics or RequestMetrics()
+        if pool_size is None:
+            pool_size = self.rate_controller.maximum
+        elif pool_size < self.rate_controller.maximum:
+            logger.info(
+                f"HTTP pool of {pool_size} connections for up to {self.rate_controller.maximum} "
+                "requests in flight, the connections above it are closed after each request"
+            )
+        self.pool_size = pool_size
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def headers(self, content_type=None):
+        """
+        Build the common request headers.
+        input: (str)content_type, Added as Content-Type when given.
+        return: (dict)headers
+        """
+        headers = {"Accept": "application/vnd.bentley.itwin-platform.v1+json"}
+        if self.authorization_key:
+            headers["Authorization"] = self.authorization_key
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
+
+    def getTimeout(self, url):
+        """
+        Get the (connect, read) timeout for the endpoint of an url.
+        return: (tuple)timeout
+        """
+        segments = urlsplit(url).path.strip("/").split("/")
+        return self.timeouts.get(segments[0], DEFAULT_TIMEOUT)
+
+    def endpoint(self, url):
+        """
+        Get the endpoint of an url, the key of its circuit breaker.
+        return: (str)endpoint, e.g. "api.bentley.com/issues"
+        """
+        parts = urlsplit(url)
+        return parts.netloc + "/" + parts.path.strip("/").split("/")[0]
+
+    @staticmethod
+    def route(url):
+        """
+        Get the route of an url, its path with the IDs replaced, the key of its metrics.
+        return: (str)route, e.g. "/issues/{id}"
+        """
+        segments = urlsplit(url).path.strip("/").split("/")
+        return "/" + "/".join(
+            segment if segment in ROUTE_SEGMENTS else "{id}" for segment in segments if segment
+        )
+
+    def request(self, method, url, **kwargs):
+        with self.metrics.call(self.route(url), method.upper()) as track:
+            return self.send(method, url, track, **kwargs)
+
+    def send(self, method, url, track, **kwargs):
+        kwargs.setdefault("timeout", self.getTimeout(url))
+        endpoint = self.endpoint(url)
+        # The token request itself goes without, wherever the token endpoint is
+        if (
+            self.token_provider is None
+            or not url.startswith(self.base_url)
+            or url == self.token_provider.auth.url
+        ):
+            return self.rate_controller.call(
+                endpoint, method, track(lambda: self.session.request(method, url, **kwargs))
+            )
+
+        # The header is set on every request, so a refreshed token is picked up mid-run.
+        # It is taken before the rate controller, the token request needs a slot of its own.
+        authorization = self.token_provider.authorization()
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["Authorization"] = authorization
+
+        @track
+        def send():
+            return self.session.request(method, url, headers=headers, **kwargs)
+
+        response = self.rate_controller.call(endpoint, method, send)
+        if response.status_code == 401:
+            # Expired or revoked before its time, refresh and try once more
+            headers["Authorization"] = self.token_provider.refresh(stale=authorization)
+            response = self.rate_controller.call(endpoint, method, send)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+### Auth
+class Auth:
+    def __init__(self, client_id, client_secret, scope, client, url=IMS_TOKEN_URL):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.client = client
+        self.url = url
+
+    def requestToken(self):
+        """
+        Request an access token of the client credentials.
+        return: (dict)content, {token_type:'', access_token:'', expires_in:0, ...}
+        raise: APIError if the token endpoint does not return 200.
+        """
+        # Data required grant_type, client_id, client_secret and scope
+        data = {
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "scope": self.scope,
+        }
+
+        response = self.client.post(self.url, data=data)
+        # logger.info(self.client_id)
+        # logger.info(self.client_secret)
+        if response.status_code != 200:
+            raise APIError("getToken", response.status_code)
+        return decodeResponse(response)
+
+    def getToken(self):
+        """
+        Get access token.
+        return: (str)bearer_token
+        """
+        try:
+            content = self.requestToken()
+            token_type = content["token_type"]
+            access_token = content["access_token"]
+            bearer_token = f"{token_type} {access_token}"
+            return bearer_token
+
+        except APIError as e:
+            errorhandler("getToken", f"failed, {e.status_code}")
+
+        except Exception as e:
+            errorhandler("getToken", f"exception trigged, {e}")
+
+
+class TokenProvider:
+    """
+    Keep a valid access token for the client: requested when first needed, refreshed
+    ahead of its expiry and on demand after a 401, and optionally cached in a file
+    readable by the owner only, so that short consecutive runs share it.
+    input: (Auth)auth
+           (float)refresh_margin, Seconds before the expiry the token is refreshed.
+           (str)cache_path, The cache file, None to not cache.
+    """
+
+    def __init__(self, auth, refresh_margin=300, cache_path=None):
+        self.auth = auth
+        self.refresh_margin = refresh_margin
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0.0
+
+        # The cache only holds tokens of the same credentials and scope
+        self.cache_key = hashlib.sha256(
+            f"{auth.client_id}\n{auth.scope}\n{auth.url}".encode()
+        ).hexdigest()
+
+    def authorization(self):
+        """
+        Get the Authorization header value, refreshing the token if it is about to expire.
+        return: (str)bearer_token
+        raise: APIError if a new token could not be requested.
+        """
+        with self.lock:
+            if self.token is None:
+                self.loadCache()
+            if self.token is None or time.time() >= self.expires_at - self.refresh_margin:
+                self.fetch()
+            return self.token
+
+    def refresh(self, stale=None):
+        """
+        Request a new token.
+        input: (str)stale, The token that was refused. When another thread has already
+               replaced it, that token is returned instead of requesting one more.
+        return: (str)bearer_token
+        """
+        with self.lock:
+            if stale is None or stale == self.token:
+                self.fetch()
+            return self.token
+
+    def fetch(self):
+        content = self.auth.requestToken()
+        self.token = f"{content['token_type']} {content['access_token']}"
+        # IMS tokens last an hour when expires_in is not given
+        self.expires_at = time.time() + float(content.get("expires_in", 3600))
+        logger.info("Got access token.")
+        self.saveCache()
+
+    def loadCache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            # Not trusted if anyone but the owner could have read or written it
+            if os.stat(self.cache_path).st_mode & 0o077:
+                logger.info(f"Token cache {self.cache_path} ignored, it is not mode 600")
+                return
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.info(f"Token cache {self.cache_path} ignored, {e}")
+            return
+        if cached.get("key") == self.cache_key and cached.get("expires_at", 0) > time.time():
+            self.token = cached["token"]
+            self.expires_at = cached["expires_at"]
+            logger.info("Got access token from the cache.")
+
+    def saveCache(self):
+        if not self.cache_path:
+            return
+        cached = {"key": self.cache_key, "token": self.token, "expires_at": self.expires_at}
+        temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w") as f:
+                json.dump(cached, f)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logger.info(f"Token cache {self.cache_path} not written, {e}")
+
+
+###### iTwinsAPI
+class iTwinsAPI:
+    def __init__(self, client):
+        self.client = client
+
+    def getAllProjectsviaiTwins(self):
+        """
+        Get all projects via iTwinsAPI.
+        return: list_projects
+        raise: APIError if the iTwins API does not return 200.
+        """
+        url = f"{self.client.base_url}/itwins/?subClass=Project"
+
+        """
+        Returns in the format:
+        [{'id': '8e6d360a-eb84-4e87-8a31-e99229d9128f', 'class': 'Endeavor', 'subClass': 'Project', 'type': None, 'number': 'JTC Semiconspace (Synchro)', 'displayName': 'JTC D&B Semiconspace @ Tampines WFP', 'status': 'Active'}]
+        """
+
+        headers = self.client.headers()
+        response = self.client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise APIError("getAllProjectsviaiTwins", response.status_code)
+        content = decodeResponse(response)
+        list_projects = content["iTwins"]
+        return list_projects
+
+
+###### Forms
+class FormsAPI:
+    def __init__(self, client):
+        self.client = client
+
+    def getProjectFormData(self, projectId, formtype):
+        """
+        Get form data instances.
+        input: (str)projectId, The GUID of the project to get forms for.
+        return: (list)list_formDataInstances, The list of form data instances under the project.
+                [object1, object2 ...], object1->{id:'', displayname:'', type:'', state:''}
+        """
+        try:
+            list_formDataInstances = []
+            for page in self.iterProjectFormData(projectId, formtype):
+                list_formDataInstances.extend(page)
+            return list_formDataInstances
+
+        except APIError as e:
+            logger.info(f"getFormDataDetails failed {e.status_code}")
+            return None
+
+        except Exception as e:
+            logger.info(f"getFormDataDetails except trigged {e}")
+            return None
+
+    def iterProjectFormData(self, projectId, formtype):
+        """
+        Get form data instances page by page, following _links.next lazily.
+        input: (str)projectId, The GUID of the project to get forms for.
+        return: (generator) one list of form data instances per page.
+        raise: APIError if a page does not return 200.
+        """
+        url = f"{self.client.base_url}/forms/"
+        params = {"type": formtype, "projectId": projectId}
+        headers = self.client.headers()
+
+        while True:
+            response = self.client.get(url, headers=headers, params=params)
+            if response.status_code != 200:
+                raise APIError("getProjectFormData", response.status_code)
+
+            content = decodeResponse(response)
+            yield content["formDataInstances"]
+
+            if "next" not in content["_links"]:
+                return
+            # The next link already carries the query
+            url = content["_links"]["next"]["href"]
+            params = None
+
+    def getFormDataDetails(self, formId):
+        """
+        Get form data details.
+        input: (str)formId, The ID of the form data instance to retrieve.
+        return: (dict)content, The dict of form data details.
+                {
+                    'formData':{
+                        id:'',
+                        subject:'',
+                        description:'',
+                        dueDate:'',
+                        type:'',
+                        ...}
+                }
+        """
+        try:
+            url = f"{self.client.base_url}/forms/{formId}"
+            headers = self.client.headers()
+
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                errorhandler("getFormDataDetails", "failed " + str(response.status_code))
+
+        except Exception as e:
+            errorhandler("getFormDataDetails", "exception trigged " + str(e))
+
+    def getFormDataAttachments(self, formId):
+        """
+        Get form data attachments ID.
+        input: (str)formId, The ID of the form data instance to retrieve.
+        return: (dict)content, The dict of form data attachments details.
+                {
+                    "attachments": [{
+                             "id": "XZzxOCC8sVvUcgeXz1Ih_exlLgPfRTpAuShXz1cTpAu",
+                             "fileName": "CrackedConcrete.png",
+                             "createdDateTime": "2020-10-20T16:16:30.6704320Z",
+                             "size": 34770,
+                             "caption": "Picture of the cracked concrete",
+                             "binding": null,
+                             "type": "png"
+                        },
+                        {
+                             "id": "XZzxOCC8sVvUcgeXz1Ih_exlLgPfRTpAuShXz1cTpAu",
+                             "fileName": "StreetView.png",
+                             "createdDateTime": "2020-10-20T16:08:30.2804722Z",
+                             "size": 56893,
+                             "caption": "Picture showing the bridge from the perspective of an approaching car",
+                             "binding": "Location",
+                             "type": "png"
+                        }
+                    ]
+                }
+        Dict{Attachments: List[Dict{"id": },{"id"}]}
+        """
+        try:
+            url = f"{self.client.base_url}/forms/{formId}/attachments"
+            headers = self.client.headers()
+
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                errorhandler("getFormDataAttachments", "failed " + str(response.status_code))
+
+        except Exception as e:
+            errorhandler("getFormDataAttachments", "exception trigged " + str(e))
+
+    def getFormAttachments(self, formId, attachmentId):
+        """
+        Get form data attachments based on form Id and attachment ID.
+        input: (str)formId, The ID of the form data instance to retrieve.
+        (str)attachmentId, The ID of the form attachment to retrieve.
+        return: The attachment's file contents
+
+        """
+        try:
+            url = f"{self.client.base_url}/forms/{formId}/attachments/{attachmentId}"
+
+            headers = self.client.headers()
+
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                # content = response.read()
+                # content = jsonParser(response)
+
+                return response
+
+            else:
+                errorhandler("getFormAttachments", "failed " + str(response.status_code))
+
+        except Exception as e:
+            errorhandler("getFormAttachments", "exception trigged " + str(e))
+
+    def exportFormPdfs(self, formId, folderId):
+        """
+        Get form data attachments based on form Id and folder ID.
+        input: (str)formId, The ID of the form data instance to retrieve.
+        (str)folderId, The ID of the folder to retrieve.
+        return: The export's file contents
+        fb8p_AI-gEmA8dDxsQ-yiJ2t0gYGwz1PoazaH1hSMOM
+        """
+        try:
+            # https://api.bentley.com/forms/storageExport?ids[&includeHeader][&fileType][&folderId]
+            url = f"{self.client.base_url}/forms/storageExport?ids={formId}&folderId={folderId}"
+
+            headers = self.client.headers()
+
+            #             params = {"folderId": folderId,
+            #                     }
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                # content = jsonParser(response)
+
+                return response
+
+            else:
+                errorhandler("exportFormPdfs", "failed" + str(response.status_code))
+
+        except Exception as e:
+            logger.info(e)
+            # errorhandler('exportFormPdfs', 'exception trigged'+ str(e) )
+
+    def updateFormData(self, formId, updateformjsonload):
+        """
+        Create issue data form
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        return: (dict)content, The dict of issue data details.
+                {
+                    'issueData':{
+                        id:'',
+                        subject:'',
+                        description:'',
+                        dueDate:'',
+                        type:'',
+                        ...}
+                }
+        """
+        try:
+            url = f"{self.client.base_url}/forms/{formId}"
+            headers = self.client.headers(content_type="application/json")
+
+            # convert string or dictionary into json format
+            # json_data = payload
+            # logger.info (json_data)
+            response = self.client.patch(url, data=updateformjsonload, headers=headers)
+
+            if response.status_code == 200:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                errorhandler("updateFormData", " failed " + str(response.status_code))
+
+        except Exception as e:
+            errorhandler("updateFormData", " exception trigged " + str(e))
+
+
+##### Issues
+class IssuesAPI:
+    def __init__(self, client):
+        self.client = client
+
+    def getProjectIssueDefinitions(self, projectId, formtype):
+        """
+        Get issue data definition.
+        input: (str)projectId, The GUID of the project to get issue.
+        return: (list)list_IssueDataInstances, The list of issue data instances under the project.
+                [object1, object2 ...], object1->{id:'', displayname:'', type:'', state:''}
+        """
+        try:
+            url = f"{self.client.base_url}/issues/formDefinitions?"
+
+            params = {"type": formtype, "projectId": projectId}
+            headers = self.client.headers()
+
+            # list_issueDataDefinition = []
+
+            while True:
+                response = self.client.get(url, headers=headers, params=params)
+                if response.status_code == 200:
+                    content = decodeResponse(response)
+                    return content
+
+                else:
+                    logger.error("getIssueDataDefinitions failed %s", response.status_code)
+                    return None
+
+        except Exception as e:
+            logger.error("getIssueDataDefinition except trigged %s", e)
+            return None
+
+    def getProjectIssueData(self, projectId, issuetype):
+        """
+        Get issue data instances.
+        input: (str)projectId, The GUID of the project to get issue.
+        return: (list)list_IssueDataInstances, The list of issue data instances under the project.
+                [object1, object2 ...], object1->{id:'', displayname:'', type:'', state:''}
+        """
+        try:
+            list_issueDataInstances = []
+            for page in self.iterProjectIssueData(projectId, issuetype):
+                list_issueDataInstances.extend(page)
+            return list_issueDataInstances
+
+        except APIError as e:
+            logger.error("getProjectIssueData failed " + str(e.status_code))
+            return None
+
+        except Exception as e:
+            logger.error("getProjectIssueData except trigged " + str(e))
+            return None
+
+    def iterProjectIssueData(self, projectId, issuetype, params=None):
+        """
+        Get issue data instances page by page, following _links.next lazily.
+        input: (str)projectId, The GUID of the project to get issue.
+               (dict)params, More query filters of the list, e.g. {"state": "Open"}.
+        return: (generator) one list of issue data instances per page.
+        raise: APIError if a page does not return 200.
+        """
+        url = f"{self.client.base_url}/issues/?projectId={projectId}&type={issuetype}"
+        headers = self.client.headers()
+
+        while True:
+            response = self.client.get(url, headers=headers, params=params)
+            if response.status_code != 200:
+                raise APIError("getProjectIssueData", response.status_code)
+
+            content = decodeResponse(response)
+            yield content["issues"]
+
+            if "next" not in content["_links"]:
+                return
+            # The next link carries the query
+            url = content["_links"]["next"]["href"]
+            params = None
+
+    def getProjectIssueDataDetails(
+        self, projectId, issuetype, max_workers=8, select=None, params=None
+    ):
+        """
+        Get the issue data details of every issue of a type under the project.
+        The list pages are downloaded in the background and the detail requests for
+        a page start as soon as it arrives, instead of after the last page.
+        input: (str)projectId, The GUID of the project to get issue.
+               (str)issuetype, The issue type, e.g. "RSS Attendance V1".
+               (int)max_workers, The maximum number of detail requests in flight.
+               (callable)select, Called with each issue of the list, the details are only
+               fetched when it returns True. Defaults to every issue.
+               (dict)params, More query filters of the list, see iterProjectIssueData.
+        return: (list)list_issueDetails, The issue data details that could be fetched,
+                or None if the issue list could not be retrieved.
+        """
+        list_issueDetails = []
+        skipped = 0
+
+        def selectedIssueIds(pages):
+            nonlocal skipped
+            for page in pages:
+                for issues in page:
+                    if select is None or select(issues):
+                        yield issues["id"]
+                    else:
+                        skipped += 1
+
+        try:
+            pages = prefetch(self.iterProjectIssueData(projectId, issuetype, params))
+            issueIds = selectedIssueIds(pages)
+            for result in self.iterIssueDataDetails(issueIds, max_workers=max_workers):
+                if result.content is not None:
+                    list_issueDetails.append(result.content)
+                else:
+                    logger.info(f"{result.issueId} - No Issue Data Details. {result.error}")
+
+        except APIError as e:
+            logger.error("getProjectIssueData failed " + str(e.status_code))
+            return None
+
+        except Exception as e:
+            logger.error("getProjectIssueData except trigged " + str(e))
+            return None
+
+        if skipped:
+            logger.info(f"{issuetype} - Skipped the details of {skipped} issues")
+
+        return list_issueDetails
+
+    def getIssueDataDetails(self, issueId):
+        """
+        Get issue data details.
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        return: (dict)content, The dict of issue data details.
+                {
+                    'issueData':{
+                        id:'',
+                        subject:'',
+                        description:'',
+                        dueDate:'',
+                        type:'',
+                        ...}
+                }
+        """
+        try:
+            url = f"{self.client.base_url}/issues/{issueId}"
+            headers = self.client.headers()
+
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                logger.error("getIssueDataDetails failed %s", response.status_code)
+
+        except Exception as e:
+            errorhandler("getIssueDataDetails", "exception trigged " + str(e))
+
+    def fetchIssueDataDetails(self, issueId):
+        """
+        Get issue data details, raising instead of exiting on failure.
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        return: (dict)content, The dict of issue data details, as getIssueDataDetails.
+        raise: APIError if the response is not 200, requests.RequestException on transport errors.
+        """
+        url = f"{self.client.base_url}/issues/{issueId}"
+        headers = self.client.headers()
+
+        response = self.client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise APIError("getIssueDataDetails", response.status_code)
+
+        return decodeResponse(response)
+
+    def getIssueDataDetailsBatch(self, issueIds, max_workers=8):
+        """
+        Get issue data details of many issues concurrently.
+        input: (list)issueIds, The IDs of the issue data instances to retrieve.
+               (int)max_workers, The maximum number of requests in flight.
+        return: (list)results, One IssueDetailResult(issueId, content, error) per issueId, in input order.
+                A failed fetch has content None and the exception in error.
+        """
+        return list(self.iterIssueDataDetails(issueIds, max_workers=max_workers))
+
+    def iterIssueDataDetails(self, issueIds, max_workers=8, window=None):
+        """
+        Get issue data details concurrently while issueIds is still being produced.
+        input: (iterable)issueIds, The IDs of the issue data instances to retrieve.
+               (int)max_workers, The maximum number of requests in flight.
+               (int)window, The maximum number of results held before being yielded,
+               defaults to 4 * max_workers.
+        return: (generator) one IssueDetailResult per issueId, in input order.
+        """
+        window = window or max_workers * 4
+        pending = deque()
+
+        def result(issueId, future):
+            try:
+                return IssueDetailResult(issueId, future.result(), None)
+            except Exception as e:
+                return IssueDetailResult(issueId, None, e)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for issueId in issueIds:
+                future = executor.submit(self.fetchIssueDataDetails, issueId)
+                pending.append((issueId, future))
+                if len(pending) >= window:
+                    yield result(*pending.popleft())
+
+            while pending:
+                yield result(*pending.popleft())
+
+    def postIssueData(self, jsonload):
+        """
+        Create issue data form
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        return: (dict)content, The dict of issue data details.
+                {
+                    'issueData':{
+                        id:'',
+                        subject:'',
+                        description:'',
+                        dueDate:'',
+                        type:'',
+                        ...}
+                }
+        """
+        try:
+            url = f"{self.client.base_url}/issues/"
+            headers = self.client.headers(content_type="application/json")
+
+            # convert string or dictionary into json format
+            # json_data = payload
+            # logger.info (json_data)
+            response = self.client.post(url, data=jsonload, headers=headers)
+
+            if response.status_code == 201:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                logger.error("postIssueData failed %s", response.status_code)
+
+        except Exception as e:
+            errorhandler("postIssueData", "exception trigged" + str(e))
+
+    def updateIssueData(self, issueId, updatejsonload):
+        """
+        update issue data form
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        return: (dict)content, The dict of issue data details.
+                {
+                    'issueData':{
+                        id:'',
+                        subject:'',
+                        description:'',
+                        dueDate:'',
+                        type:'',
+                        ...}
+                }
+        """
+        try:
+            url = f"{self.client.base_url}/issues/{issueId}"
+            headers = self.client.headers(content_type="application/json")
+
+            # convert string or dictionary into json format
+            # json_data = payload
+            # logger.info (json_data)
+            response = self.client.patch(url, data=updatejsonload, headers=headers)
+
+            if response.status_code == 200:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                logger.error("updateIssueData failed " + str(response.status_code))
+                return None
+
+        except Exception as e:
+            errorhandler("updateIssueData", "exception trigged " + str(e))
+
+    def patchIssueData(self, issueId, updatejsonload):
+        """
+        Send the update issue data PATCH without interpreting the response.
+        input: (str)issueId, The ID of the issue data instance to update.
+               (str)updatejsonload, The JSON body of the update.
+        return: (requests.Response)response
+        """
+        url = f"{self.client.base_url}/issues/{issueId}"
+        headers = self.client.headers(content_type="application/json")
+
+        return self.client.patch(url, data=updatejsonload, headers=headers)
+
+    def exportIssuePdfs(self, IssueId, folderId):
+        """
+        Get issue data attachments based on issue Id and issue ID.
+        input: (str)issueId, The ID of the issue data instance to retrieve.
+        (str)folderId, The ID of the folder to retrieve.
+        return: The export's file contents
+        fb8p_AI-gEmA8dDxsQ-yiJ2t0gYGwz1PoazaH1hSMOM
+        """
+        try:
+            # https://api.bentley.com/issues/storageExport?ids[&includeHeader][&fileType][&folderId]
+            # https://api.bentley.com/issues/storageExport?ids[&includeHeader][&fileType][&folderId]
+            url = f"{self.client.base_url}/issues/storageExport?ids={IssueId}&folderId={folderId}"
+
+            headers = self.client.headers()
+
+            #             params = {"folderId": folderId,
+            #                       "fileType": "pdf",
+            #                       "includeHeader": "true"
+            #                     }
+            response = self.client.get(url, headers=headers)
+            if response.status_code == 200:
+                # content = jsonParser(response)
+
+                return response
+
+            else:
+                logger.error("exportIssuePdfs failed %s", response.status_code)
+
+        except Exception as e:
+            errorhandler("exportIssuePdfs", "exception trigged" + str(e))
+
+
+##### Write-back
+# One entry per submitted update of UpdateDispatcher.run
+# content is the updated issue on success, error is set on failure
+UpdateResult = namedtuple(
+    "UpdateResult", ["issueId", "label", "payload", "content", "error"]
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of requests.
+    input: (float)rate, The number of tokens added per second.
+           (float)capacity, The maximum burst size, defaults to rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available and take it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class UpdateDispatcher:
+    """
+    Queue update issue data payloads and send them concurrently.
+    All PATCHes share one token bucket, the retries of a 429, 5xx or transport error
+    are made by the RateController of the client.
+    input: (IssuesAPI)issues_API
+           (int)max_workers, The maximum number of PATCHes in flight.
+           (float)rate, The maximum number of PATCHes started per second.
+           (TokenBucket)bucket, Shared with other dispatchers to limit their rate together,
+           defaults to a bucket of its own at rate.
+    """
+
+    def __init__(self, issues_API, max_workers=8, rate=10, bucket=None):
+        self.issues_API = issues_API
+        self.max_workers = max_workers
+        self.bucket = bucket or TokenBucket(rate)
+        self.queue = []
+        self.skipped = []
+
+    def submit(self, issueId, updatejsonload, label=None):
+        """
+        Queue an update.
+        input: (str)issueId, The ID of the issue data instance to update.
+               (str)updatejsonload, The JSON body of the update.
+               (str)label, Shown in the logs, defaults to issueId.
+        """
+        self.queue.append((issueId, updatejsonload, label or issueId))
+
+    def skip(self, issueId, label=None):
+        """
+        Record an issue that needs no update, it is reported in the summary of the next run.
+        """
+        self.skipped.append(UpdateResult(issueId, label or issueId, None, None, None))
+
+    def run(self):
+        """
+        Send every queued update and empty the queue.
+        return: (dict)summary, {"succeeded": [UpdateResult], "failed": [UpdateResult],
+                "skipped": [UpdateResult]}
+        """
+        pending, self.queue = self.queue, []
+        summary = {"succeeded": [], "failed": [], "skipped": self.skipped}
+        self.skipped = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._send, issueId, updatejsonload)
+                for issueId, updatejsonload, label in pending
+            ]
+            for (issueId, updatejsonload, label), future in zip(pending, futures):
+                try:
+                    result = UpdateResult(
+                        issueId, label, updatejsonload, future.result(), None
+                    )
+                    summary["succeeded"].append(result)
+                except Exception as e:
+                    result = UpdateResult(issueId, label, updatejsonload, None, e)
+                    summary["failed"].append(result)
+
+        return summary
+
+    def _send(self, issueId, updatejsonload):
+        self.bucket.acquire()
+        response = self.issues_API.patchIssueData(issueId, updatejsonload)
+        if response.status_code != 200:
+            raise APIError("updateIssueData", response.status_code)
+        return decodeResponse(response)
+
+
+def logUpdateSummary(summary, formname, projectname=None):
+    """
+    Log the outcome of every update of an UpdateDispatcher.run summary.
+    input: (dict)summary
+           (str)formname, e.g. "RSS Form"
+           (str)projectname, Prefixed to the logs, as projects are updated concurrently.
+    """
+    prefix = f"{projectname} - " if projectname else ""
+    for result in summary["succeeded"]:
+        logger.info(f"{prefix}{result.label}'s {formname} updated")
+    for result in summary["failed"]:
+        logger.info(f"{prefix}{result.label}'s {formname} failed to update. {result.error}")
+        logger.info(result.payload)
+    logger.info(
+        f"{prefix}{formname}: {len(summary['succeeded'])} updated, "
+        f"{len(summary['failed'])} failed, {len(summary['skipped'])} already up to date"
+    )
+
+
+##Export
+class StorageAPI:
+    def __init__(self, client):
+        self.client = client
+
+    def getTopLevelFolder(self, projectId):
+        try:
+            url = f"{self.client.base_url}/storage/?projectId={projectId}"
+
+            headers = self.client.headers()
+
+            list_folderInstances = []
+
+            response = self.client.get(url, headers=headers)
+
+            if response.status_code == 200:
+                content = decodeResponse(response)
+                list_folderInstances.extend(content["items"])
+
+                return list_folderInstances
+                # return content
+
+            else:
+                logger.error("getTopLevelFolder failed %s", response.status_code)
+                return None
+
+        #             while(True):
+        #                 response = self.client.get(url, headers=headers)
+        #                 #response = self.client.get(url, headers=headers, params = params)
+        #                 if(response.status_code == 200):
+        #                     content = decodeResponse(response)
+        #                     list_folderInstances.extend(content['items'])
+
+        #                     if('next' in content['_links']):
+        #                         url = content['_links']['next']['href']
+        #                         logger.info("next")
+
+        #                     else:
+        #                         return list_folderInstances
+
+        #                 else:
+        #                     logger.info('getTopLevelFolder failed', response.status_code)
+        #                     return None
+
+        except Exception as e:
+            logger.info("getTopLevelFolder except trigged %s", e)
+            return None
+
+    def createFolder(self, folderId, jsonload):
+        """
+        create a new folder
+        "displayName": "test",
+        "description": "test folder"
+        """
+
+        try:
+            url = f"{self.client.base_url}/storage/folders/{folderId}/folders"
+
+            headers = self.client.headers()
+
+            response = self.client.post(url, data=jsonload, headers=headers)
+
+            if response.status_code == 201:
+                content = decodeResponse(response)
+
+                return content
+
+            else:
+                errorhandler("createFolder", "failed" + str(response.status_code))
+
+        except Exception as e:
+            errorhandler("createFolder", "exception trigged" + str(e))
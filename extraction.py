@@ -0,0 +1,204 @@
+"""
+Extraction stage of the RSS Attendance and Post OT forms: pulls the fields the
+compute and write-back stages use straight from the issue data details into a dataframe,
+instead of flattening every field of every issue with pandas.json_normalize.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from attendance import (
+    DAY_CODE,
+    OT_MEAL,
+    OT_TIME_IN,
+    OT_TIME_OUT,
+    TIME_IN,
+    TIME_OUT,
+    AttendanceMonth,
+    IssueRecord,
+    parseHHMM,
+)
+from writeback import RSS_TOTALS, VOLATILE_PROPERTIES
+
+# Issue fields, dotted for nested objects like json_normalize names them
+ISSUE_FIELDS = (
+    "id",
+    "number",
+    "type",
+    "status",
+    "state",
+    "createdDateTime",
+    "lastModifiedDateTime",
+    "assignee.displayName",
+    "assignee.id",
+)
+
+# Property keys of the per-day fields, D1... to D31..., e.g. D1__x0020__Day but not D10 for day 1
+DAY_PROPERTY_RE = re.compile(r"^D([1-9]|[12][0-9]|3[01])(?![0-9])")
+
+# The Dn fields the updates write, kept to compare with
+CURRENT_DAY_SUFFIXES = ("__x0020__Work__x0020__Hour", "__x0020__OT")
+
+# The Dn fields parsed into minutes
+TIME_SUFFIXES = (TIME_IN, TIME_OUT, OT_TIME_IN, OT_TIME_OUT)
+
+# fields: the issue fields, properties: the property keys, pattern: the property keys matching it
+ExtractionSpec = namedtuple("ExtractionSpec", ["fields", "properties", "pattern"])
+
+# Every Dn field, and the totals the updates are compared with
+RSS_SPEC = ExtractionSpec(
+    ISSUE_FIELDS,
+    tuple(key for key, column in RSS_TOTALS) + VOLATILE_PROPERTIES,
+    DAY_PROPERTY_RE,
+)
+
+POST_OT_SPEC = ExtractionSpec(
+    ISSUE_FIELDS,
+    ("ActualOTStart", "ActualOTEnd", "RSSMeal1", "RSS__x0020__OT__x0020__1")
+    + VOLATILE_PROPERTIES,
+    None,
+)
+
+
+def fieldValue(issue, path):
+    """
+    Get a nested field of an issue.
+    input: (dict)issue
+           (list)path, The keys of the field, e.g. ["assignee", "id"].
+    return: the value, None if the issue does not have the field
+    """
+    value = issue
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def extractIssues(issues, spec):
+    """
+    Build the dataframe of the issue data details from only the fields of the spec.
+    The columns are named like pandas.json_normalize would, "assignee.id", "properties.<key>",
+    and the fields an issue does not have are left missing. The issue fields are always there,
+    the property columns only if some issue has the property.
+    input: (iterable)issues, The "issue" of every issue data details, e.g. a group of groupIssueDataDetails.
+           (ExtractionSpec)spec, The fields to extract, RSS_SPEC or POST_OT_SPEC.
+    return: (pandas.DataFrame)df
+    """
+    issues = list(issues)
+    paths = [field.split(".") for field in spec.fields]
+    columns = {field: [] for field in spec.fields}
+
+    # Property key -> its values, and which keys are wanted, decided once per key
+    properties = {}
+    wanted = dict.fromkeys(spec.properties, True)
+
+    for row, issue in enumerate(issues):
+        for field, path in zip(spec.fields, paths):
+            columns[field].append(fieldValue(issue, path))
+
+        for key, value in (issue.get("properties") or {}).items():
+            keep = wanted.get(key)
+            if keep is None:
+                keep = wanted[key] = bool(spec.pattern and spec.pattern.match(key))
+            if not keep:
+                continue
+            values = properties.get(key)
+            if values is None:
+                # Missing until set, on every issue that does not have the property
+                values = properties[key] = [None] * len(issues)
+            values[row] = value
+
+    for key, values in properties.items():
+        columns["properties." + key] = values
+
+    # Each column is inferred once to its own dtype, as json_normalize would
+    return pd.DataFrame(columns)
+
+
+def numberValue(value):
+    """
+    Convert a property value to a number, like pandas.to_numeric(errors="coerce").
+    return: (float)number, NaN if value is missing or not a number
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def extractAttendanceMonth(issues, spec=RSS_SPEC):
+    """
+    Build the compact model of the RSS Attendance forms straight from the issue data details.
+    The Dn text fields are coded into int8 matrices, the times parsed into float32 minute
+    matrices, the meals into a float64 hour matrix, and the rest of the forms kept in one
+    IssueRecord each.
+    input: (iterable)issues, The "issue" of every issue data details, e.g. a group of groupIssueDataDetails.
+           (ExtractionSpec)spec, The spec.properties are kept on the records to compare with.
+    return: (AttendanceMonth)month
+    """
+    issues = list(issues)
+    rows = len(issues)
+    wanted = frozenset(spec.properties)
+    codes, minutes, hours, present = {}, {}, {}, {}
+
+    # Property key -> (day index, suffix), None for the keys that are not Dn fields
+    fields = {}
+
+    records = []
+    for row, issue in enumerate(issues):
+        current = {}
+        for key, value in (issue.get("properties") or {}).items():
+            if key in wanted:
+                current["properties." + key] = value
+
+            field = fields.get(key, ())
+            if field == ():
+                match = DAY_PROPERTY_RE.match(key)
+                field = fields[key] = (
+                    (int(match.group(1)) - 1, key[match.end():]) if match else None
+                )
+                if field is not None:
+                    present.setdefault(field[1], np.zeros(31, dtype=bool))[field[0]] = True
+            if field is None:
+                continue
+
+            day, suffix = field
+            if suffix in CURRENT_DAY_SUFFIXES:
+                current["properties." + key] = value
+
+            if isinstance(value, str) and value in DAY_CODE:
+                if suffix not in codes:
+                    codes[suffix] = np.full((rows, 31), -1, dtype=np.int8)
+                codes[suffix][row, day] = DAY_CODE[value]
+
+            if suffix in TIME_SUFFIXES:
+                if suffix not in minutes:
+                    minutes[suffix] = np.full((rows, 31), np.nan, dtype=np.float32)
+                minutes[suffix][row, day] = parseHHMM(value)
+            elif suffix == OT_MEAL:
+                if suffix not in hours:
+                    hours[suffix] = np.full((rows, 31), np.nan)
+                hours[suffix][row, day] = numberValue(value)
+
+        records.append(
+            IssueRecord(
+                issue.get("id"),
+                issue.get("number"),
+                issue.get("status"),
+                issue.get("state"),
+                issue.get("createdDateTime"),
+                fieldValue(issue, ("assignee", "displayName")),
+                fieldValue(issue, ("assignee", "id")),
+                current,
+            )
+        )
+
+    return AttendanceMonth(records, codes, minutes, present, hours)
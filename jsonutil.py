@@ -0,0 +1,430 @@
+"""
+JSON decoding: a strict fast path for the API responses, and JsonComment for the
+JSON with comments of the config and template files.
+"""
+
+import logging
+import re
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+# The fastest decoder available of orjson, ujson and the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def loadsFast(data):
+    """
+    Decode plain JSON, without the comments, templates and trailing commas of JsonComment.
+    input: (bytes or str)data
+    return: the decoded object
+    raise: ValueError if data is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decodeResponse(response):
+    """
+    Decode the JSON body of an API response straight from its bytes.
+    input: (requests.Response)response
+    return: the decoded object
+    raise: ValueError if the body is not valid JSON.
+    """
+    return loadsFast(response.content)
+
+
+# Wrapper
+
+
+class GenericWrapper:
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+
+    # Fallback lookup for undefined methods
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+# Comments
+
+#!/bin/python
+# coding: utf-8
+
+##########################################################################################################################################
+
+# For templating
+
+# The parser
+
+# For templating
+class ExtractError(Exception):
+    pass
+
+
+def extract(obj, pointer):
+    """
+    Get the value a JSON Pointer (RFC 6901) points to, e.g. "/issues/0/id".
+    input: (dict or list)obj, The root object.
+           (str)pointer
+    return: the pointed value
+    raise: ExtractError if the pointer is not valid or points to nothing.
+    """
+    if pointer == "":
+        return obj
+    if not pointer.startswith("/"):
+        raise ExtractError("Not a JSON Pointer: {}".format(pointer))
+
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(obj, dict):
+            if token not in obj:
+                raise ExtractError("No member {!r}: {}".format(token, pointer))
+            obj = obj[token]
+        elif isinstance(obj, list):
+            if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+                raise ExtractError("Not an index {!r}: {}".format(token, pointer))
+            if int(token) >= len(obj):
+                raise ExtractError("Out of range {!r}: {}".format(token, pointer))
+            obj = obj[int(token)]
+        else:
+            raise ExtractError("Nothing to point at {!r}: {}".format(token, pointer))
+    return obj
+
+
+##########################################################################################################################################
+
+# Comments, outside of strings only
+COMMENT_PREFIX = ("#", ";", "//")
+MULTILINE_START = "/*"
+MULTILINE_END = "*/"
+
+# Data strings
+LONG_STRING = '"""'
+
+# JSON Pointer template
+TEMPLATE_START = "{{"
+TEMPLATE_RE = re.compile(r"\{\{(.*?)\}\}")
+
+# Size of the chunks JsonComment.load reads files by
+CHUNK_SIZE = 1 << 16
+
+# Tokenizer states
+NORMAL, STRING, LONG_STRING_BODY, LINE_COMMENT, BLOCK_COMMENT = range(5)
+
+# A run of plain JSON, copied as is: no comment, no long string, and no comma that may be trailing
+PLAIN_RUN_RE = re.compile(
+    r'(?:[^"#;/,]+|"(?=[^"])[^"\\\r\n]*(?:\\.[^"\\\r\n]*)*"|""(?=[^"])|,(?=\s*[^\s\]}#;/]))+',
+    re.DOTALL,
+)
+# The rest of a string, up to its closing quote
+STRING_REST_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s*")
+NEWLINE_RE = re.compile(r"\r?\n")
+
+
+class CommentTokenizer:
+    """
+    Single pass tokenizer of the JSON with comments dialect into standard JSON, fed chunk by chunk.
+    Outside of strings, it drops the comments, "#", ";" and "//" to the end of the line and
+    "/* */", and the trailing commas before "]" and "}". Long strings, triple quoted, become
+    strings, their lines stripped and joined. The strings are copied as they are.
+    Every character is looked at once, whatever the chunks, so it is linear in the input size.
+    """
+
+    def __init__(self):
+        self.state = NORMAL
+        self.pieces = []
+        # The end of the last chunk that can only be told with the next one, e.g. "/" or '""'
+        self.carry = ""
+        # A comma waiting for the next token, dropped if it is "]" or "}"
+        self.pending_comma = False
+        # Long strings: at the start of a line, and the whitespace at the end of the line so far
+        self.line_start = False
+        self.trailing = ""
+
+    def feed(self, chunk):
+        text = self.carry + chunk
+        self.carry = ""
+        self._scan(text, False)
+
+    def close(self):
+        """
+        return: (str)standard_json, the JSON of every chunk fed
+        """
+        text = self.carry
+        self.carry = ""
+        self._scan(text, True)
+        # Left for the parser to report
+        if self.pending_comma:
+            self.pieces.append(",")
+        if self.state == LONG_STRING_BODY:
+            self.pieces.append(self.trailing)
+        return "".join(self.pieces)
+
+    def _scan(self, text, final):
+        out = self.pieces.append
+        pos, end = 0, len(text)
+
+        while pos < end:
+            state = self.state
+
+            if state == NORMAL:
+                if self.pending_comma:
+                    pos = WHITESPACE_RE.match(text, pos).end()
+                    if pos == end:
+                        break
+                    if text[pos] in "]}":
+                        self.pending_comma = False
+                    elif text[pos] not in "#;/":
+                        out(",")
+                        self.pending_comma = False
+
+                match = PLAIN_RUN_RE.match(text, pos)
+                if match:
+                    out(match.group())
+                    pos = match.end()
+                    continue
+
+                char = text[pos]
+                if char == ",":
+                    self.pending_comma = True
+                    pos += 1
+                elif char == '"':
+                    if end - pos < 3 and not final:
+                        self.carry = text[pos:]
+                        return
+                    out('"')
+                    if text.startswith(LONG_STRING, pos):
+                        self.state = LONG_STRING_BODY
+                        self.line_start = False
+                        self.trailing = ""
+                        pos += 3
+                    else:
+                        self.state = STRING
+                        pos += 1
+                elif char in "#;":
+                    self.state = LINE_COMMENT
+                    pos += 1
+                else:
+                    # "/"
+                    if pos + 1 == end and not final:
+                        self.carry = char
+                        return
+                    following = text[pos + 1 : pos + 2]
+                    if following == "/":
+                        self.state = LINE_COMMENT
+                        pos += 2
+                    elif following == "*":
+                        self.state = BLOCK_COMMENT
+                        pos += 2
+                    else:
+                        out(char)
+                        pos += 1
+
+            elif state == STRING:
+                match = STRING_REST_RE.match(text, pos)
+                out(match.group())
+                pos = match.end()
+                if pos == end:
+                    break
+                if text[pos] == '"':
+                    out('"')
+                    self.state = NORMAL
+                    pos += 1
+                elif final:
+                    out(text[pos:])
+                    pos = end
+                else:
+                    # A backslash escaping the first character of the next chunk
+                    self.carry = text[pos:]
+                    return
+
+            elif state == LINE_COMMENT:
+                newline = text.find("\n", pos)
+                if newline < 0:
+                    break
+                self.state = NORMAL
+                pos = newline + 1
+
+            elif state == BLOCK_COMMENT:
+                close = text.find(MULTILINE_END, pos)
+                if close < 0:
+                    if text.endswith("*") and not final:
+                        self.carry = "*"
+                    break
+                self.state = NORMAL
+                pos = close + len(MULTILINE_END)
+
+            else:
+                close = text.find(LONG_STRING, pos)
+                if close >= 0:
+                    self._longString(text[pos:close])
+                    out(self.trailing)
+                    out('"')
+                    self.state = NORMAL
+                    pos = close + len(LONG_STRING)
+                    continue
+                # Keep the quotes that may start the closing one
+                stop = end
+                if not final:
+                    while stop > pos and end - stop < 2 and text[stop - 1] == '"':
+                        stop -= 1
+                self._longString(text[pos:stop])
+                self.carry = text[stop:]
+                return
+
+    def _longString(self, text):
+        # Each line stripped, and followed by a single space if it ended with one
+        out = self.pieces.append
+        for index, line in enumerate(NEWLINE_RE.split(text)):
+            if index:
+                if self.trailing.rstrip("\r").endswith(" "):
+                    out(" ")
+                self.trailing = ""
+                self.line_start = True
+            if self.line_start:
+                line = line.lstrip()
+                if not line:
+                    continue
+                self.line_start = False
+            stripped = line.rstrip()
+            if stripped:
+                out(self.trailing)
+                out(stripped)
+                self.trailing = line[len(stripped) :]
+            else:
+                self.trailing += line
+
+
+class JsonComment(GenericWrapper):
+    def __init__(self, wrapped=json):
+        super().__init__(wrapped)
+
+    # Loads a JSON string with comments
+    # Allows to expand the JSON Pointer templates
+    def loads(self, jsonsc, *args, template=True, **kwargs):
+        return self._loadChunks([jsonsc], *args, template=template, **kwargs)
+
+    # Loads a JSON opened file with comments
+    def load(self, jsonf, *args, **kwargs):
+        # Reads the text file chunk by chunk, straight into the tokenizer
+        chunks = iter(lambda: jsonf.read(CHUNK_SIZE), "")
+        return self._loadChunks(chunks, *args, **kwargs)
+
+    def _loadChunks(self, chunks, *args, template=True, **kwargs):
+        # Process the chunks to remove the comments
+        jsons = self._preprocess(chunks)
+        # Calls the wrapped to parse JSON
+        self.obj = self.wrapped.loads(jsons, *args, **kwargs)
+        # If there are templates, subs them
+        if template and TEMPLATE_START in jsons:
+            self._templatesub(self.obj)
+        return self.obj
+
+    # Opens a JSON file with comments
+    # Allows a default value if loading or parsing fails
+    def loadf(self, path, *args, default=None, **kwargs):
+        # Preparing the default
+        json_obj = default
+
+        # Opening file in append+read mode
+        # Allows creation of empty file if non-existent
+        with open(path, mode="a+", encoding="UTF-8") as jsonf:
+            try:
+                # Back to file start
+                jsonf.seek(0)
+                # Parse and load the JSON
+                json_obj = self.load(jsonf, *args, **kwargs)
+            # If fails, default value is kept
+            except ValueError:
+                pass
+
+        return json_obj
+
+    # Saves a JSON file with indentation
+    def dumpf(
+        self, json_obj, path, *args, indent=4, escape_forward_slashes=False, **kwargs
+    ):
+        # Opening file in write mode
+        with open(path, mode="w", encoding="UTF-8") as jsonf:
+            # Dumping the object
+            # Keyword escape_forward_slashes is only for ujson, standard json raises an exception for unknown keyword
+            # In that case, the method is called again without it
+            try:
+                json.dump(
+                    json_obj,
+                    jsonf,
+                    *args,
+                    indent=indent,
+                    escape_forward_slashes=escape_forward_slashes,
+                    **kwargs,
+                )
+            except TypeError:
+                json.dump(json_obj, jsonf, *args, indent=indent, **kwargs)
+
+    # Reads chunks and skips comments
+    def _preprocess(self, chunks):
+        tokenizer = CommentTokenizer()
+        for chunk in chunks:
+            tokenizer.feed(chunk)
+        return tokenizer.close()
+
+    # Walks the json object and subs template strings with pointed value
+    def _templatesub(self, obj):
+        # Gets items for iterables
+        if isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, list):
+            items = enumerate(obj)
+        else:
+            items = None
+
+        # Walks the iterable
+        for key, subobj in items:
+            # If subobj is another iterable, call this method again
+            if isinstance(subobj, (dict, list)):
+                self._templatesub(subobj)
+            # If is a string:
+            # - Find all matches to the template
+            # - For each match, get through JSON Pointer the value, which must be a string
+            # - Substitute each match to the pointed value, or ""
+            # - The string with all templates substitued is written back to the parent obj
+            elif isinstance(subobj, str):
+                obj[key] = TEMPLATE_RE.sub(self._repl_getvalue, subobj)
+
+    # Replacement function
+    # The match has the JSON Pointer
+    def _repl_getvalue(self, match):
+        try:
+            # Extracts the pointed value from the root object
+            value = extract(self.obj, match[1])
+            # If it's not a string, it's not valid
+            if not isinstance(value, str):
+                raise ValueError("Not a string: {}".format(value))
+        except (ExtractError, ValueError) as e:
+            # Sets value to empty string
+            value = ""
+            logger.info(e)
+        return value
+
+
+##########################################################################################################################################
+
+
+def jsonParser(text):
+    """
+    Get parse string to json.
+    return: converted_Jsontext
+    """
+    parser = JsonComment(json)
+    converted_Jsontext = parser.loads(text)
+    return converted_Jsontext
@@ -0,0 +1,485 @@
+"""
+Update pipelines of the RSS Attendance and Post OT forms, project by project: fetch the forms
+to update, compute them and send the updates, with the state kept between runs and the
+scheduler of the projects. Importing it makes no request.
+"""
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+import hashlib
+import logging
+import multiprocessing
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from attendance import StageMonitor, computeMonthStages, postOTHours
+from bentley import UpdateDispatcher, groupIssueDataDetails, logUpdateSummary
+from extraction import POST_OT_SPEC, RSS_SPEC, extractAttendanceMonth, extractIssues
+from writeback import (
+    POST_OT_ELIGIBILITY,
+    RSS_ELIGIBILITY,
+    buildPostOTPayloads,
+    buildRSSPayloads,
+    diffPayload,
+)
+
+logger = logging.getLogger(__name__)
+
+# Project with Post OT Forms
+POST_OT_PROJECT = "69c70697-3747-4120-b185-dbd7d54388a0"
+
+# Form Type for OT Request Form
+OTReq = "Overtime Request Form"
+
+# Issue Type for RSS Attendance Form
+RSS = "RSS Attendance V1"
+
+# The forms a run can update
+FORMS = ("post-ot", "rss")
+
+
+##### State
+class IssueStateStore:
+    """
+    Local SQLite record of the issue revisions seen and the payloads pushed by earlier runs,
+    so that issues that have not changed since are not fetched, recomputed or updated again.
+    input: (str)path, The SQLite database file.
+           (bool)enabled, When False nothing is skipped, but the revisions are still recorded.
+    """
+
+    def __init__(self, path, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS issue_state (
+                    id TEXT PRIMARY KEY,
+                    type TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    payload TEXT,
+                    updated_at TEXT
+                )
+                """
+            )
+
+    @staticmethod
+    def contentHash(issue):
+        return hashlib.sha256(
+            json.dumps(issue, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def isChanged(self, issue):
+        """
+        Check an issue against the last recorded revision.
+        The lastModifiedDateTime is compared when the issue carries one (list or details),
+        otherwise the content hash of the issue details is.
+        input: (dict)issue, An issue of the list or the "issue" of its details.
+        return: (bool) True if the issue is new or has changed.
+        """
+        if not self.enabled:
+            return True
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT last_modified, content_hash FROM issue_state WHERE id = ?",
+                (issue["id"],),
+            ).fetchone()
+
+        if row is None:
+            return True
+        last_modified, content_hash = row
+        if issue.get("lastModifiedDateTime") and last_modified:
+            return issue["lastModifiedDateTime"] != last_modified
+        return self.contentHash(issue) != content_hash
+
+    def selectChanged(self, list_issueDetails):
+        """
+        Keep the issue data details that are new or have changed.
+        return: (list)list_issueDetails
+        """
+        return [
+            issueDetail
+            for issueDetail in list_issueDetails
+            if self.isChanged(issueDetail["issue"])
+        ]
+
+    def record(self, issue, payload=None):
+        """
+        Record the current revision of an issue, and the payload pushed to it if any.
+        input: (dict)issue, The "issue" of the issue data details.
+               (str)payload, The JSON body of the update.
+        """
+        self.recordMany([(issue, payload)])
+
+    def recordMany(self, revisions):
+        """
+        Record the revisions of many issues in a single transaction, one commit for all.
+        input: (iterable)revisions, The (issue, payload) of every issue, as for record.
+        """
+        updated_at = datetime.now(timezone.utc).isoformat()
+        # Hashed before taking the lock, the other projects keep reading meanwhile
+        rows = [
+            (
+                issue["id"],
+                issue.get("type"),
+                issue.get("lastModifiedDateTime"),
+                self.contentHash(issue),
+                payload,
+                updated_at,
+            )
+            for issue, payload in revisions
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO issue_state (id, type, last_modified, content_hash, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    type = excluded.type,
+                    last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash,
+                    payload = COALESCE(excluded.payload, issue_state.payload),
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+    def recordRun(self, list_issueDetails, summary):
+        """
+        Record the outcome of a run over list_issueDetails, in a single transaction.
+        Updated issues are recorded with the revision returned by the PATCH, the others
+        with the revision that was fetched. Failed updates are not recorded, so they are
+        retried by the next run.
+        input: (list)list_issueDetails, The issue data details that were processed.
+               (dict)summary, The summary of UpdateDispatcher.run.
+        """
+        failed = {result.issueId for result in summary["failed"]}
+        updated = {result.issueId: result for result in summary["succeeded"]}
+
+        revisions = []
+        for issueDetail in list_issueDetails:
+            issue = issueDetail["issue"]
+            if issue["id"] in failed:
+                continue
+            if issue["id"] in updated:
+                result = updated[issue["id"]]
+                revisions.append(
+                    ((result.content or {}).get("issue", issue), result.payload)
+                )
+            else:
+                revisions.append((issue, None))
+        self.recordMany(revisions)
+
+    def close(self):
+        self.connection.close()
+
+
+##### Scheduler
+# One project of a ProjectScheduler.run
+# counts: {name: number} returned by the job, error: the exception if the project failed
+ProjectResult = namedtuple("ProjectResult", ["project", "seconds", "counts", "error"])
+
+
+class ProjectScheduler:
+    """
+    Run the pipelines of independent projects concurrently.
+    Every project runs in a thread of its own with its own detail fetch and update workers,
+    all of them sharing the HTTP connection pool of the client and the update rate limit.
+    A project that fails is logged and reported in the summary, the others carry on.
+    input: (int)max_projects, The maximum number of projects processed at once.
+           (int)compute_processes, The processes computing the forms, 0 computes them
+           in the project threads.
+    """
+
+    def __init__(self, max_projects=4, compute_processes=0):
+        self.max_projects = max_projects
+        self.compute_executor = None
+        if compute_processes > 0:
+            # Not forked: the workers start on the first compute, from a project thread, while
+            # the other threads may hold locks. Spawned workers import the modules afresh,
+            # which makes no request.
+            self.compute_executor = ProcessPoolExecutor(
+                max_workers=compute_processes, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def compute(self, function, *args):
+        """
+        Run a CPU heavy function, in the process pool if there is one.
+        The function and its arguments must be picklable then.
+        return: the result of function(*args)
+        """
+        if self.compute_executor is None:
+            return function(*args)
+        return self.compute_executor.submit(function, *args).result()
+
+    def run(self, projects, job):
+        """
+        Run the job of every project.
+        input: (list)projects, The projects of iTwinsAPI.getAllProjectsviaiTwins.
+               (callable)job, Called with a project, returns a dict of counts for the summary.
+        return: (list) one ProjectResult per project, in the order of projects
+        """
+
+        def timedJob(project):
+            start = time.perf_counter()
+            try:
+                counts, error = job(project) or {}, None
+            except (Exception, SystemExit) as e:
+                # errorhandler exits, which must only end this project
+                counts, error = {}, e
+                logger.error(f"{project['displayName']} - failed. {e!r}")
+            return ProjectResult(project, time.perf_counter() - start, counts, error)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_projects, thread_name_prefix="project"
+        ) as executor:
+            return list(executor.map(timedJob, projects))
+
+    def close(self):
+        if self.compute_executor is not None:
+            self.compute_executor.shutdown()
+
+
+def logRunSummary(results):
+    """
+    Log the time and counts of every project of a ProjectScheduler.run, slowest first.
+    input: (list)results, The ProjectResult of every project.
+    """
+    for result in sorted(results, key=lambda result: result.seconds, reverse=True):
+        counts = ", ".join(f"{count} {name}" for name, count in result.counts.items())
+        outcome = f"failed. {result.error!r}" if result.error is not None else "done"
+        logger.info(
+            f"{result.project['displayName']} - {result.seconds:.1f}s, "
+            f"{counts or 'nothing to update'}, {outcome}"
+        )
+    failed = sum(result.error is not None for result in results)
+    logger.info(f"{len(results)} projects processed, {failed} failed")
+
+
+##### Pipelines
+def postOTFrame(issues):
+    """
+    Build the dataframe of the Post OT Forms, only the fields the Post OT hours and updates use.
+    input: (iterable)issues, The "issue" of every issue data details.
+    return: (pandas.DataFrame)dfPostOT, with the creation day and its month, "yearmonth".
+    """
+    dfPostOT = extractIssues(issues, POST_OT_SPEC)
+    # Convert the datetime into just day, month and year
+    dfPostOT["createdDateTime"] = dfPostOT["createdDateTime"].apply(
+        lambda x: pd.to_datetime(x).strftime("%Y-%m-%d")
+    )
+    # To filter month and year
+    dfPostOT["yearmonth"] = dfPostOT["createdDateTime"].apply(
+        lambda x: pd.to_datetime(x).strftime("%Y-%m")
+    )
+    return dfPostOT
+
+
+# The settings of a run of the pipelines
+# detail_fetch_workers: concurrent issue detail requests, window: the ProcessingWindow,
+# server_filter: ask the Issues API for the forms to update, trace_memory: report the peak
+# memory and the copies of every compute stage, update_workers: concurrent update PATCHes per project
+Settings = namedtuple(
+    "Settings",
+    ["detail_fetch_workers", "window", "server_filter", "trace_memory", "update_workers"],
+)
+
+
+class AttendanceRun:
+    """
+    Update the forms of the projects, project by project, the job of a ProjectScheduler.
+    input: (IssuesAPI)issues_API
+           (Settings)settings
+           (IssueStateStore)state_store
+           (ProjectScheduler)scheduler, Computes the RSS Attendance Forms.
+           (TokenBucket)update_bucket, Shared by the update dispatchers of every project.
+           (tuple)forms, The forms to update, of FORMS.
+           (datetime.date)today, Defaults to today.
+    """
+
+    def __init__(
+        self,
+        issues_API,
+        settings,
+        state_store,
+        scheduler,
+        update_bucket,
+        forms=FORMS,
+        today=None,
+    ):
+        self.issues_API = issues_API
+        self.settings = settings
+        self.state_store = state_store
+        self.scheduler = scheduler
+        self.update_bucket = update_bucket
+        self.forms = forms
+        self.today = today or date.today()
+
+    def fetchIssueDetails(self, project, issuetype, rule):
+        """
+        Get the issue data details of the forms of a project to update: eligible by the rule,
+        in the window and changed since the last run.
+        input: (dict)project
+               (str)issuetype
+               (EligibilityRule)rule
+        return: (list)list_issueDetails
+        """
+        window = self.settings.window
+        state_store = self.state_store
+
+        # Get the Issue data details of every issue to update, page by page
+        list_issueDetails = self.issues_API.getProjectIssueDataDetails(
+            project["id"],
+            issuetype,
+            max_workers=self.settings.detail_fetch_workers,
+            select=lambda issue: (
+                rule.select(issue) and window.select(issue) and state_store.isChanged(issue)
+            ),
+            params=rule.query() if self.settings.server_filter else None,
+        )
+
+        # Skip the issues not updated, out of the window or that have not changed since the last run
+        if list_issueDetails:
+            count = len(list_issueDetails)
+            list_issueDetails = rule.selectDetails(list_issueDetails)
+            list_issueDetails = state_store.selectChanged(window.selectDetails(list_issueDetails))
+            logger.info(
+                f"{project['displayName']} - {count - len(list_issueDetails)} forms not to update skipped"
+            )
+        return list_issueDetails
+
+    def sendUpdates(self, issuePayloads, dispatcher):
+        """
+        Send the updates that change anything, through the dispatcher of the project.
+        input: (iterable)issuePayloads, The IssuePayload of buildRSSPayloads or buildPostOTPayloads.
+               (UpdateDispatcher)dispatcher
+        return: (dict)summary, The summary of dispatcher.run.
+        """
+        for issuePayload in issuePayloads:
+            # Only send the properties that differ from the issue
+            updatejsonload = diffPayload(issuePayload.payload, issuePayload.current)
+            if updatejsonload is None:
+                dispatcher.skip(issuePayload.issueId, issuePayload.label)
+                continue
+
+            updatejson_data = json.dumps(updatejsonload)
+            dispatcher.submit(issuePayload.issueId, updatejson_data, issuePayload.label)
+        return dispatcher.run()
+
+    def updatePostOTForms(self, project, dispatcher):
+        """
+        Update the OT hours of the Post OT Forms of a project.
+        input: (dict)project
+               (UpdateDispatcher)dispatcher, The dispatcher of the project.
+        return: (dict)summary, The summary of dispatcher.run, or None if there is no form to update.
+        """
+        # Get Post OT Form
+        # Get all OT Request form
+        logger.info(f"{project['displayName']} - Extracting Post OT Forms")
+        list_issueDetails = self.fetchIssueDetails(project, "Post OT Form", POST_OT_ELIGIBILITY)
+
+        if not list_issueDetails:
+            logger.info(f"{project['displayName']} - No Post OT Form.")
+            return None
+
+        logger.info(f"{project['displayName']} - Extracted Post OT Forms")
+
+        # Group if there is more than one RSS attendance form type
+        dictLists_IssueDataDetails = groupIssueDataDetails(list_issueDetails)
+        # iterate for every Post OT issue
+        for key in dictLists_IssueDataDetails.keys():
+            dfPostOT = postOTFrame(dictLists_IssueDataDetails[key])
+
+        ##Update OT hours
+        ##Only update days that there are values
+        ## if OT hours = -ve, need to add 24 hours
+        dfPostOT["PostOTHour"] = postOTHours(dfPostOT)
+
+        # Update Attendance Form
+        summary = self.sendUpdates(buildPostOTPayloads(dfPostOT, self.today), dispatcher)
+        logUpdateSummary(summary, "Post OT Form", project["displayName"])
+        self.state_store.recordRun(list_issueDetails, summary)
+        return summary
+
+    def updateRSSForms(self, project, dispatcher):
+        """
+        Update the totals, OT and work hours of the RSS Attendance Forms of a project.
+        input: (dict)project
+               (UpdateDispatcher)dispatcher, The dispatcher of the project.
+        return: (dict)summary, The summary of dispatcher.run, or None if there is no form to update.
+        """
+        ##Get all the issue data ID related to RSS Attendance V1
+        logger.info(f"{project['displayName']} - Extracting RSS Attendance Forms")
+        list_issueDetails = self.fetchIssueDetails(project, RSS, RSS_ELIGIBILITY)
+
+        if not list_issueDetails:
+            logger.info(f"{project['displayName']} - No RSS Attendance Forms")
+            return None
+
+        # Group if there is more than one RSS attendance form type
+        dictLists_IssueDataDetails = groupIssueDataDetails(list_issueDetails)
+
+        logger.info(f"{project['displayName']} - Extracted RSS Attendance Forms")
+        # iterate for every RSS attendance issue
+        for key in dictLists_IssueDataDetails.keys():
+            # convert into the compact attendance model, only the Dn fields and the totals
+            month = extractAttendanceMonth(dictLists_IssueDataDetails[key], RSS_SPEC)
+
+        ##Calculate the total leave, off, mc, hospitalisation
+        ##Count every day status of every form in one pass over the day columns
+        ##Update OT hours and Working Hours
+        ##Computed for all 31 days at once from the time in / time out / meal matrices
+        dfRSS2, monitor = self.scheduler.compute(
+            computeMonthStages, month, self.settings.trace_memory
+        )
+        totals = monitor.totals()
+        logger.info(
+            f"{project['displayName']} - Computed {len(dfRSS2)} RSS Attendance Forms in "
+            f"{totals['seconds']:.3f}s ("
+            + "; ".join(StageMonitor.format(record) for record in monitor.stages)
+            + ")"
+        )
+
+        # Update Attendance Form
+        summary = self.sendUpdates(buildRSSPayloads(dfRSS2, self.today), dispatcher)
+        logUpdateSummary(summary, "RSS Form", project["displayName"])
+        self.state_store.recordRun(list_issueDetails, summary)
+        return summary
+
+    def updateProject(self, project):
+        """
+        Update the forms of a project, the job of the scheduler.
+        The Post OT Forms are only in POST_OT_PROJECT.
+        return: (dict)counts, The updated, failed and up to date forms of each type.
+        """
+        counts = {}
+        jobs = []
+        if "post-ot" in self.forms and project["id"] == POST_OT_PROJECT:
+            jobs.append(("Post OT", self.updatePostOTForms))
+        if "rss" in self.forms:
+            jobs.append(("RSS", self.updateRSSForms))
+
+        for formname, updateForms in jobs:
+            dispatcher = UpdateDispatcher(
+                self.issues_API,
+                max_workers=self.settings.update_workers,
+                bucket=self.update_bucket,
+            )
+            summary = updateForms(project, dispatcher)
+            if summary is None:
+                continue
+            counts[f"{formname} updated"] = len(summary["succeeded"])
+            counts[f"{formname} failed"] = len(summary["failed"])
+            counts[f"{formname} up to date"] = len(summary["skipped"])
+        return counts
@@ -0,0 +1,154 @@
+"""
+Selection of the issues to process: the processing window on their creation date.
+Applied to the issue list, before any issue data details are fetched.
+"""
+
+import re
+from datetime import date, datetime
+
+
+def addMonths(day, months):
+    """
+    return: (datetime.date) the first day of the month months after the month of day
+    """
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parseWindowDate(text, end=False):
+    """
+    Parse a "YYYY-MM" or "YYYY-MM-DD" window bound.
+    input: (str)text
+           (bool)end, For the end bound, a month covers the whole month.
+    return: (datetime.date)day, the first day in (start) or after (end) the window
+    """
+    if re.fullmatch(r"\d{4}-\d{2}", text):
+        day = date(int(text[:4]), int(text[5:]), 1)
+        return addMonths(day, 1) if end else day
+    day = date.fromisoformat(text)
+    return date.fromordinal(day.toordinal() + 1) if end else day
+
+
+def createdDate(value):
+    """
+    Get the date of a createdDateTime, e.g. "2024-03-05T10:00:00.000Z".
+    return: (datetime.date)day, None if value is missing or not a date
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+
+
+class ProcessingWindow:
+    """
+    The forms to process, by the date they were created on, start included and end excluded.
+    input: (datetime.date)start, None for no start.
+           (datetime.date)end, None for no end.
+    """
+
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, spec, today=None):
+        """
+        Build the window from its setting, e.g. the PROCESSING_WINDOW environment variable.
+        input: (str)spec, One of
+               "all", every form, the default,
+               "current", the forms created this month,
+               "last:N", the forms created this month and the N - 1 months before,
+               "START..END", the forms created from START to END, both "YYYY-MM" or
+               "YYYY-MM-DD" and included, either may be left out, e.g. "2024-01..".
+               (datetime.date)today, Defaults to today.
+        return: (ProcessingWindow)window
+        """
+        today = today or date.today()
+        spec = (spec or "all").strip().lower()
+
+        if spec == "all":
+            return cls()
+        if spec in ("current", "month"):
+            return cls(addMonths(today, 0), addMonths(today, 1))
+
+        match = re.fullmatch(r"last:(\d+)", spec)
+        if match:
+            months = int(match.group(1))
+            if months < 1:
+                raise ValueError(f"Processing window {spec!r} needs at least 1 month")
+            return cls(addMonths(today, 1 - months), addMonths(today, 1))
+
+        if ".." in spec:
+            start, end = spec.split("..", 1)
+            try:
+                window = cls(
+                    parseWindowDate(start) if start else None,
+                    parseWindowDate(end, end=True) if end else None,
+                )
+            except ValueError:
+                window = None
+            if window is not None:
+                # An END before START would silently select nothing
+                if window.start and window.end and window.start >= window.end:
+                    raise ValueError(f"Processing window {spec!r} ends before it starts")
+                return window
+
+        raise ValueError(
+            f"Processing window {spec!r} is not all, current, last:N or START..END"
+        )
+
+    def __str__(self):
+        if self.start is None and self.end is None:
+            return "all forms"
+        start = self.start.isoformat() if self.start else "the first form"
+        end = "the last form"
+        if self.end:
+            end = date.fromordinal(self.end.toordinal() - 1).isoformat()
+        return f"forms created from {start} to {end}"
+
+    @property
+    def unbounded(self):
+        return self.start is None and self.end is None
+
+    def contains(self, createdDateTime):
+        """
+        Check whether a form created at createdDateTime is in the window.
+        Forms without a creation date are kept, the details tell later.
+        return: (bool)
+        """
+        if self.unbounded:
+            return True
+        day = createdDate(createdDateTime)
+        if day is None:
+            return True
+        if self.start is not None and day < self.start:
+            return False
+        if self.end is not None and day >= self.end:
+            return False
+        return True
+
+    def select(self, issue):
+        """
+        Check an issue of the issue list, or the "issue" of the issue data details.
+        return: (bool)
+        """
+        return self.contains(issue.get("createdDateTime"))
+
+    def selectDetails(self, list_issueDetails):
+        """
+        Keep the issue data details created in the window, for the issues the list did not date.
+        return: (list)list_issueDetails
+        """
+        if self.unbounded:
+            return list_issueDetails
+        return [
+            issueDetail
+            for issueDetail in list_issueDetails
+            if self.select(issueDetail["issue"])
+        ]
@@ -0,0 +1,89 @@
+"""
+Work hour rules of attendance.py against the per-day iterrows loop they replaced.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from attendance import clampWorkHours, saturdayOTMask
+
+NAN = float("nan")
+
+
+def legacyClamp(df, days):
+    """
+    The iterrows loop of main.py before clampWorkHours, on the D<day>_Work_Hour columns.
+    """
+    df = df.copy()
+    for d in days:
+        remarks_column = "properties.D" + str(d) + "__x002d__Remarks"
+
+        for index, row in df.iterrows():
+            is_saturday_ot = (
+                (row["properties.D" + str(d) + "__x0020__Day"] == "Sat")
+                and (remarks_column in df.columns)
+                and (row[remarks_column] == "OT")
+            )
+
+            if is_saturday_ot:
+                df.at[index, "D" + str(d) + "_Work_Hour"] = 4
+            else:
+                current_value = df.at[index, "D" + str(d) + "_Work_Hour"]
+                df.at[index, "D" + str(d) + "_Work_Hour"] = (
+                    8
+                    if current_value > 8
+                    else ((current_value - 1) if current_value > 4 else current_value)
+                )
+    return df[["D" + str(d) + "_Work_Hour" for d in days]].to_numpy(dtype=float)
+
+
+def vectorizedClamp(df, days):
+    work = df[["D" + str(d) + "_Work_Hour" for d in days]].to_numpy(dtype=float)
+    return clampWorkHours(work, saturdayOTMask(df, days))
+
+
+class WorkHourRulesTest(unittest.TestCase):
+    def setUp(self):
+        # Day 1 has a remarks column, day 2 does not
+        self.df = pd.DataFrame(
+            {
+                "properties.D1__x0020__Day": ["Sat", "Sat", "Sat", "Mon", "Fri", None, "Sun", "Tue"],
+                "properties.D1__x002d__Remarks": ["OT", "OT", None, "OT", "Present", "OT", "", "x"],
+                "D1_Work_Hour": [9.5, NAN, 9.5, 9.5, 6.5, NAN, 3.0, 4.0],
+                "properties.D2__x0020__Day": ["Sat", "Sat", "Mon", "Tue", "Wed", "Thu", None, "Sat"],
+                "D2_Work_Hour": [12.0, 8.0, 8.25, 4.5, 2.0, NAN, 7.0, 10.0],
+            }
+        )
+
+    def test_same_as_the_iterrows_loop(self):
+        expected = legacyClamp(self.df, [1, 2])
+        result = vectorizedClamp(self.df, [1, 2])
+        # Identical, NaN included
+        np.testing.assert_array_equal(result, expected)
+
+    def test_rules(self):
+        result = vectorizedClamp(self.df, [1])[:, 0]
+        # Saturday OT, NaN included, is 4, above 8 is 8, between 4 and 8 loses an hour
+        np.testing.assert_array_equal(result, [4.0, 4.0, 8.0, 8.0, 5.5, NAN, 3.0, 4.0])
+        # Without remarks there is no Saturday OT, exactly 8 loses an hour
+        np.testing.assert_array_equal(
+            vectorizedClamp(self.df, [2])[:, 0], [8.0, 7.0, 8.0, 3.5, 2.0, NAN, 6.0, 8.0]
+        )
+
+    def test_missing_day_column(self):
+        # The iterrows loop failed on it, a day without its Day column has no Saturday OT
+        df = self.df.drop(columns="properties.D1__x0020__Day")
+        with self.assertRaises(KeyError):
+            legacyClamp(df, [1])
+        self.assertFalse(saturdayOTMask(df, [1]).any())
+        np.testing.assert_array_equal(
+            vectorizedClamp(df, [1])[:, 0], [8.0, NAN, 8.0, 8.0, 5.5, NAN, 3.0, 4.0]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
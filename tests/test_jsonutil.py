@@ -0,0 +1,109 @@
+"""
+JSON with comments dialect of jsonutil.py, the CommentTokenizer fed at every chunk size.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import io
+import json
+import unittest
+
+from jsonutil import CommentTokenizer, JsonComment
+
+# Inputs the line based preprocessing got wrong, and what they are
+DIALECT_CASES = (
+    ('{"a": "x,]", "b": 1}', {"a": "x,]", "b": 1}),
+    ('{"a": 1, // inline comment\n "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": 1, /* inline */ "b": [1, 2, ], # trailing\n}', {"a": 1, "b": [1, 2]}),
+    ('{"a": """first\n# not a comment\nlast"""}', {"a": "first# not a commentlast"}),
+    ('{"url": "http://example.com/a"}', {"url": "http://example.com/a"}),
+)
+
+# Comment markers inside strings are kept
+STRING_CASES = (
+    ('{"a": "// not a comment"}', {"a": "// not a comment"}),
+    ('{"a": "# not; a comment"}', {"a": "# not; a comment"}),
+    ('{"a": "/* not */ a comment"}', {"a": "/* not */ a comment"}),
+    ('["a,]", "b,}", ",", "]"]', ["a,]", "b,}", ",", "]"]),
+)
+
+# A trailing comma is dropped across the comments before "]" or "}"
+TRAILING_COMMA_CASES = (
+    ('[1, 2, // two\n]', [1, 2]),
+    ('[1, 2, /* two */ ]', [1, 2]),
+    ('{"a": 1, # one\n ; and\n}', {"a": 1}),
+    ('{"a": [1,\n/* a\n multiline comment */\n],\n}', {"a": [1]}),
+    ('[1, /* not the end */ 2]', [1, 2]),
+)
+
+LONG_STRING_CASES = (
+    ('{"a": """one line"""}', {"a": "one line"}),
+    # Stripped at the line breaks only, as the line based preprocessing did
+    ('{"a": """  first  \n   second  """}', {"a": "  first second  "}),
+    ('["""a\n\n  b""", 1]', ["ab", 1]),
+    ('{"a": """// kept\n/* kept */"""}', {"a": "// kept/* kept */"}),
+)
+
+# Escapes and "/" that a chunk boundary may split
+BOUNDARY_CASES = (
+    ('{"a": "say \\"hi\\"", "b": 1}', {"a": 'say "hi"', "b": 1}),
+    ('{"path": "C:\\\\dir\\\\", "b": 1}', {"path": "C:\\dir\\", "b": 1}),
+    ('{"a": "\\\\\\"//", "b": 1}', {"a": '\\"//', "b": 1}),
+    ('{"a": "\\u00e9\\/"}', {"a": "\u00e9/"}),
+    ('{"a": 4 / 2 // half\n}', None),
+    ('{"a": 1 //\n, "b": 2 /**/ }', {"a": 1, "b": 2}),
+    ('{"a": 1 /* * / ** */ }', {"a": 1}),
+    ('{"a": """x""" , "b": ""}', {"a": "x", "b": ""}),
+)
+
+
+def tokenize(text, chunk):
+    tokenizer = CommentTokenizer()
+    for start in range(0, len(text), chunk):
+        tokenizer.feed(text[start : start + chunk])
+    return tokenizer.close()
+
+
+class CommentTokenizerTest(unittest.TestCase):
+    def assertEveryChunkSize(self, cases):
+        for text, expected in cases:
+            for chunk in range(1, len(text) + 1):
+                with self.subTest(text=text, chunk=chunk):
+                    # The same JSON whatever the chunks, up to the whitespace
+                    standard_json = tokenize(text, chunk)
+                    if expected is None:
+                        with self.assertRaises(ValueError):
+                            json.loads(standard_json)
+                    else:
+                        self.assertEqual(json.loads(standard_json), expected)
+
+    def test_dialect(self):
+        self.assertEveryChunkSize(DIALECT_CASES)
+
+    def test_comment_markers_in_strings(self):
+        self.assertEveryChunkSize(STRING_CASES)
+
+    def test_trailing_comma_across_comments(self):
+        self.assertEveryChunkSize(TRAILING_COMMA_CASES)
+
+    def test_long_strings(self):
+        self.assertEveryChunkSize(LONG_STRING_CASES)
+
+    def test_chunk_boundaries(self):
+        self.assertEveryChunkSize(BOUNDARY_CASES)
+
+
+class JsonCommentTest(unittest.TestCase):
+    def test_loads_and_load(self):
+        for text, expected in DIALECT_CASES + TRAILING_COMMA_CASES:
+            with self.subTest(text=text):
+                self.assertEqual(JsonComment(json).loads(text), expected)
+                self.assertEqual(JsonComment(json).load(io.StringIO(text)), expected)
+
+    def test_templates(self):
+        text = '{"ids": ["a", "b", ], // ids\n "first": "{{/ids/0}}"}'
+        self.assertEqual(JsonComment(json).loads(text), {"ids": ["a", "b"], "first": "a"})
+
+
+if __name__ == "__main__":
+    unittest.main()
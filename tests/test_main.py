@@ -0,0 +1,26 @@
+"""
+Command line of main.py.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from main import COMMANDS, parseArguments
+
+
+class ParseArgumentsTest(unittest.TestCase):
+    def test_no_command_updates_every_form(self):
+        args = parseArguments([])
+        self.assertEqual(args.command, "all")
+        self.assertIsNone(args.projects)
+        self.assertEqual(COMMANDS[args.command], ("post-ot", "rss"))
+
+    def test_command_and_projects(self):
+        args = parseArguments(["rss", "--project", "a", "--project", "b"])
+        self.assertEqual(COMMANDS[args.command], ("rss",))
+        self.assertEqual(args.projects, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
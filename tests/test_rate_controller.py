@@ -0,0 +1,199 @@
+"""
+RateController and CircuitBreaker of bentley.py, on fake responses and a fake clock.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+from unittest import mock
+
+import requests
+
+import bentley
+from bentley import CircuitBreaker, CircuitOpenError, RateController
+
+
+class FakeClock:
+    """
+    Stands for the time module in bentley, sleep moves the clock on at once.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {} if retry_after is None else {"Retry-After": retry_after}
+
+
+class FakeSession:
+    """
+    Answers the requests with the given responses in turn, an exception is raised.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def send(self):
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(bentley, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class RateControllerCallTest(ClockTestCase):
+    def test_throttled_post_is_retried_after_retry_after(self):
+        controller = RateController()
+        session = FakeSession(FakeResponse(429, retry_after="7"), FakeResponse(201))
+        response = controller.call("issues", "POST", session.send)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(session.calls, 2)
+        self.assertEqual(self.clock.sleeps, [7.0])
+
+    def test_server_error_of_post_is_not_retried(self):
+        controller = RateController()
+        session = FakeSession(FakeResponse(500), FakeResponse(201))
+        self.assertEqual(controller.call("issues", "POST", session.send).status_code, 500)
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+        session = FakeSession(requests.ConnectionError("reset"), FakeResponse(201))
+        with self.assertRaises(requests.ConnectionError):
+            controller.call("issues", "POST", session.send)
+        self.assertEqual(session.calls, 1)
+
+    def test_server_error_of_patch_is_retried(self):
+        controller = RateController()
+        session = FakeSession(FakeResponse(502), requests.ConnectionError("reset"), FakeResponse(200))
+        self.assertEqual(controller.call("issues", "PATCH", session.send).status_code, 200)
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+    def test_retries_stop_after_max_retries(self):
+        controller = RateController(max_retries=2)
+        session = FakeSession(FakeResponse(503))
+        self.assertEqual(controller.call("forms", "GET", session.send).status_code, 503)
+        self.assertEqual(session.calls, 3)
+
+    def test_open_circuit_fails_fast(self):
+        controller = RateController(failure_threshold=2, cooldown=30.0)
+        session = FakeSession(FakeResponse(500), FakeResponse(500), FakeResponse(200))
+        controller.call("issues", "POST", session.send)
+        with self.assertLogs("bentley", "ERROR"):
+            controller.call("issues", "POST", session.send)
+        with self.assertRaises(CircuitOpenError) as raised:
+            controller.call("issues", "POST", session.send)
+        self.assertEqual(raised.exception.retry_in, 30.0)
+        self.assertEqual(session.calls, 2)
+        # Each endpoint has its own circuit
+        self.assertEqual(controller.call("forms", "GET", FakeSession(FakeResponse(200)).send).status_code, 200)
+
+        self.clock.now += 30.0
+        self.assertEqual(controller.call("issues", "POST", session.send).status_code, 200)
+
+
+class CircuitBreakerTest(ClockTestCase):
+    def test_opens_after_the_threshold(self):
+        breaker = CircuitBreaker(threshold=3, cooldown=30.0)
+        self.assertFalse(breaker.record(False))
+        self.assertFalse(breaker.record(False))
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record(False))
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retryIn(), 30.0)
+
+    def test_success_resets_the_failures(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record(False)
+        breaker.record(True)
+        self.assertFalse(breaker.record(False))
+        self.assertTrue(breaker.allow())
+
+    def test_half_opens_after_the_cooldown(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=30.0)
+        breaker.record(False)
+        self.clock.now += 29.0
+        self.assertFalse(breaker.allow())
+
+        # A single trial request once the cooldown is over
+        self.clock.now += 1.0
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        # Its failure opens the circuit again, for another cooldown
+        self.assertFalse(breaker.record(False))
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retryIn(), 30.0)
+
+        # Its success closes it
+        self.clock.now += 30.0
+        self.assertTrue(breaker.allow())
+        breaker.record(True)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+
+class RateControllerLimitTest(ClockTestCase):
+    def test_throttling_halves_the_limit_once_per_burst(self):
+        controller = RateController(initial=16)
+        first, second = controller.acquire(), controller.acquire()
+        self.clock.now += 1.0
+        controller.release(first, FakeResponse(429))
+        self.assertEqual(controller.limit, 8.0)
+        # Sent before the decrease, it is part of the same burst
+        controller.release(second, FakeResponse(503))
+        self.assertEqual(controller.limit, 8.0)
+
+        controller.release(controller.acquire(), FakeResponse(429))
+        self.assertEqual(controller.limit, 4.0)
+        self.assertEqual(controller.inflight, 0)
+
+    def test_success_adds_one_over_the_limit(self):
+        controller = RateController(initial=4)
+        controller.release(controller.acquire(), FakeResponse(200))
+        self.assertEqual(controller.limit, 4.25)
+        # Client errors are answers too, 5xx and transport errors leave the limit alone
+        controller.release(controller.acquire(), FakeResponse(404))
+        self.assertAlmostEqual(controller.limit, 4.25 + 1 / 4.25)
+        limit = controller.limit
+        controller.release(controller.acquire(), FakeResponse(500))
+        controller.release(controller.acquire(), None)
+        self.assertEqual(controller.limit, limit)
+
+    def test_limit_bounds(self):
+        controller = RateController(initial=2, minimum=1, maximum=2)
+        controller.release(controller.acquire(), FakeResponse(200))
+        self.assertEqual(controller.limit, 2.0)
+        for _ in range(3):
+            self.clock.now += 1.0
+            controller.release(controller.acquire(), FakeResponse(429))
+        self.assertEqual(controller.limit, 1.0)
+
+    def test_retry_after_pauses_every_request(self):
+        controller = RateController()
+        controller.release(controller.acquire(), FakeResponse(429, retry_after="5"))
+        self.assertEqual(controller.paused_until, self.clock.now + 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
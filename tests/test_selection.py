@@ -0,0 +1,76 @@
+"""
+Processing window of selection.py, which picks the forms to process by their creation date.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+from datetime import date
+
+from selection import ProcessingWindow
+
+TODAY = date(2024, 3, 15)
+
+
+def created(day):
+    return {"id": day, "createdDateTime": day + "T10:00:00.000Z"}
+
+
+class ProcessingWindowTest(unittest.TestCase):
+    def test_all(self):
+        for spec in ("all", "", None, " ALL "):
+            window = ProcessingWindow.parse(spec, today=TODAY)
+            self.assertTrue(window.unbounded)
+            self.assertTrue(window.select(created("1999-01-01")))
+
+    def test_current(self):
+        window = ProcessingWindow.parse("current", today=TODAY)
+        self.assertEqual((window.start, window.end), (date(2024, 3, 1), date(2024, 4, 1)))
+        self.assertFalse(window.select(created("2024-02-29")))
+        self.assertTrue(window.select(created("2024-03-01")))
+        self.assertTrue(window.select(created("2024-03-31")))
+        self.assertFalse(window.select(created("2024-04-01")))
+
+    def test_last_months(self):
+        window = ProcessingWindow.parse("last:3", today=TODAY)
+        self.assertEqual((window.start, window.end), (date(2024, 1, 1), date(2024, 4, 1)))
+        # Across the year
+        window = ProcessingWindow.parse("last:4", today=TODAY)
+        self.assertEqual(window.start, date(2023, 12, 1))
+        self.assertTrue(window.select(created("2023-12-01")))
+        self.assertFalse(window.select(created("2023-11-30")))
+
+    def test_range_end_is_included_then_excluded(self):
+        window = ProcessingWindow.parse("2024-01..2024-02", today=TODAY)
+        self.assertEqual((window.start, window.end), (date(2024, 1, 1), date(2024, 3, 1)))
+        self.assertTrue(window.select(created("2024-02-29")))
+        self.assertFalse(window.select(created("2024-03-01")))
+
+        window = ProcessingWindow.parse("2024-01-10..2024-01-20", today=TODAY)
+        self.assertFalse(window.select(created("2024-01-09")))
+        self.assertTrue(window.select(created("2024-01-10")))
+        self.assertTrue(window.select(created("2024-01-20")))
+        self.assertFalse(window.select(created("2024-01-21")))
+
+    def test_open_range(self):
+        window = ProcessingWindow.parse("2024-01..", today=TODAY)
+        self.assertEqual((window.start, window.end), (date(2024, 1, 1), None))
+        window = ProcessingWindow.parse("..2024-01", today=TODAY)
+        self.assertEqual((window.start, window.end), (None, date(2024, 2, 1)))
+
+    def test_undated_forms_are_kept(self):
+        window = ProcessingWindow.parse("current", today=TODAY)
+        self.assertTrue(window.select({"id": "x"}))
+        self.assertTrue(window.select({"id": "x", "createdDateTime": "yesterday"}))
+        details = [{"issue": created("2024-03-05")}, {"issue": created("2024-02-05")}]
+        self.assertEqual(window.selectDetails(details), details[:1])
+
+    def test_malformed_raises(self):
+        for spec in ("last", "last:0", "last:x", "2024", "2024-13..", "2024-1..2024-02",
+                     "2024-01-32..", "2024-03..2024-01", "weekly"):
+            with self.subTest(spec=spec), self.assertRaisesRegex(ValueError, "Processing window"):
+                ProcessingWindow.parse(spec, today=TODAY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+IssueStateStore of pipelines.py, which decides the issues skipped by the next runs.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from bentley import UpdateResult
+from pipelines import IssueStateStore
+
+
+def makeIssue(issueId="RSS-1", modified="2024-05-01T08:00:00.000Z", **fields):
+    issue = {
+        "id": issueId,
+        "type": "RSS Attendance V1",
+        "state": "Open",
+        "lastModifiedDateTime": modified,
+        "properties": {"Sum_Leave": 1},
+    }
+    issue.update(fields)
+    if modified is None:
+        del issue["lastModifiedDateTime"]
+    return issue
+
+
+def summaryOf(succeeded=(), failed=()):
+    return {"succeeded": list(succeeded), "failed": list(failed), "skipped": []}
+
+
+class IssueStateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = IssueStateStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def recorded(self):
+        return self.store.connection.execute("SELECT COUNT(*) FROM issue_state").fetchone()[0]
+
+    def test_new_issue_is_changed(self):
+        self.assertTrue(self.store.isChanged(makeIssue()))
+
+    def test_same_last_modified_is_unchanged(self):
+        self.store.record(makeIssue())
+        # Even with other content, the timestamp decides when both have one
+        self.assertFalse(self.store.isChanged(makeIssue(properties={"Sum_Leave": 2})))
+
+    def test_changed_last_modified_is_changed(self):
+        self.store.record(makeIssue())
+        self.assertTrue(self.store.isChanged(makeIssue(modified="2024-05-02T08:00:00.000Z")))
+
+    def test_content_hash_without_timestamp(self):
+        self.store.record(makeIssue(modified=None))
+        self.assertFalse(self.store.isChanged(makeIssue(modified=None)))
+        self.assertTrue(self.store.isChanged(makeIssue(modified=None, properties={})))
+
+    def test_list_item_without_timestamp_is_changed(self):
+        self.store.record(makeIssue())
+        # The list item has fewer fields than the details that were hashed
+        item = {"id": "RSS-1", "type": "RSS Attendance V1", "state": "Open"}
+        self.assertTrue(self.store.isChanged(item))
+
+    def test_record_run(self):
+        updated, failed, untouched = makeIssue("RSS-1"), makeIssue("RSS-2"), makeIssue("RSS-3")
+        patched = makeIssue("RSS-1", modified="2024-05-03T08:00:00.000Z")
+        summary = summaryOf(
+            succeeded=[UpdateResult("RSS-1", "a", '{"x": 1}', {"issue": patched}, None)],
+            failed=[UpdateResult("RSS-2", "b", '{"x": 2}', None, "500")],
+        )
+        self.store.recordRun([{"issue": issue} for issue in (updated, failed, untouched)], summary)
+
+        # The failed PATCH is not recorded, so the next run tries it again
+        self.assertTrue(self.store.isChanged(failed))
+        self.assertEqual(self.recorded(), 2)
+        # The updated issue is recorded with the revision the PATCH returned, with its payload
+        self.assertFalse(self.store.isChanged(patched))
+        self.assertTrue(self.store.isChanged(updated))
+        payload = self.store.connection.execute(
+            "SELECT payload FROM issue_state WHERE id = ?", ("RSS-1",)
+        ).fetchone()[0]
+        self.assertEqual(payload, '{"x": 1}')
+        self.assertFalse(self.store.isChanged(untouched))
+
+    def test_record_many_keeps_the_last_payload(self):
+        issue = makeIssue()
+        self.store.recordMany([(issue, '{"x": 1}')])
+        self.store.recordMany([(issue, None)])
+        payload = self.store.connection.execute("SELECT payload FROM issue_state").fetchone()[0]
+        self.assertEqual(payload, '{"x": 1}')
+
+    def test_disabled_skips_nothing_but_records(self):
+        store = IssueStateStore(":memory:", enabled=False)
+        issue = makeIssue()
+        store.recordRun([{"issue": issue}], summaryOf())
+        self.assertTrue(store.isChanged(issue))
+        self.assertEqual(store.selectChanged([{"issue": issue}]), [{"issue": issue}])
+        count = store.connection.execute("SELECT COUNT(*) FROM issue_state").fetchone()[0]
+        self.assertEqual(count, 1)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Update payload diff of writeback.py, which leaves out the properties the issues already hold.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from writeback import diffPayload, isSameValue
+
+NAN = float("nan")
+
+
+def makePayload(**properties):
+    return {
+        "assignee": {"displayName": "Tan", "id": "u-1"},
+        "properties": dict({"Updated__x0020__Date__x0020__By": "2024-05-01"}, **properties),
+    }
+
+
+class IsSameValueTest(unittest.TestCase):
+    def test_numbers_and_numeric_strings(self):
+        self.assertTrue(isSameValue(21.5, "21.5"))
+        self.assertTrue(isSameValue("21.5", 21.5))
+        self.assertTrue(isSameValue(8, "8.0"))
+        self.assertFalse(isSameValue(21.5, "21.6"))
+
+    def test_missing_values(self):
+        self.assertTrue(isSameValue(None, NAN))
+        self.assertFalse(isSameValue(0, None))
+        self.assertFalse(isSameValue(None, "0"))
+
+    def test_text(self):
+        self.assertTrue(isSameValue("Open", "Open"))
+        self.assertFalse(isSameValue("Open", "Closed"))
+
+
+class DiffPayloadTest(unittest.TestCase):
+    def test_keeps_only_the_changed_properties(self):
+        payload = makePayload(TotalOff=2, TotalWorkingHours="21.5")
+        current = {"properties.TotalOff": 3, "properties.TotalWorkingHours": 21.5}
+        result = diffPayload(payload, current)
+        # The volatile properties go along with a real change
+        self.assertEqual(
+            result["properties"], {"TotalOff": 2, "Updated__x0020__Date__x0020__By": "2024-05-01"}
+        )
+        self.assertEqual(result["assignee"], payload["assignee"])
+        # The payload is not changed
+        self.assertIn("TotalWorkingHours", payload["properties"])
+
+    def test_volatile_properties_are_ignored(self):
+        payload = makePayload(TotalOff=2)
+        current = {"properties.TotalOff": "2", "properties.Updated__x0020__Date__x0020__By": "2024-04-01"}
+        self.assertIsNone(diffPayload(payload, current))
+
+    def test_missing_property_is_changed(self):
+        payload = makePayload(TotalOff=2, D1__x0020__OT=1.5)
+        current = {"properties.TotalOff": 2}
+        self.assertEqual(
+            diffPayload(payload, current)["properties"],
+            {"D1__x0020__OT": 1.5, "Updated__x0020__Date__x0020__By": "2024-05-01"},
+        )
+
+    def test_payload_that_becomes_empty(self):
+        payload = makePayload(TotalOff=2, TotalWorkingHours=21.5)
+        current = {"properties.TotalOff": 2.0, "properties.TotalWorkingHours": "21.5"}
+        self.assertIsNone(diffPayload(payload, current))
+        self.assertIsNone(diffPayload(makePayload(), {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
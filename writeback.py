@@ -0,0 +1,264 @@
+"""
+Write-back stage of the RSS Attendance and Post OT forms: turns the computed
+dataframes into the update issue data payloads.
+"""
+
+import math
+from collections import namedtuple
+
+import pandas as pd
+
+# The RSS Attendance forms that are updated, by status
+RSS_UPDATE_STATUSES = (
+    "Assigned to RSS",
+    "Send to Main Contractor For Verification",
+    "Send to Consultant For Verification",
+    "Send to JTC For Verification",
+    "Send to Lead RSS For Verification",
+)
+
+# The Post OT forms that are updated, by state
+POST_OT_UPDATE_STATES = ("Open",)
+
+
+class EligibilityRule:
+    """
+    The forms that are updated, by the value of one of their issue fields.
+    Declared once and checked on the issue list, on the issue data details and on the payloads.
+    input: (str)field, The issue field, e.g. "status".
+           (tuple)values, The values of the forms that are updated.
+    """
+
+    def __init__(self, field, values):
+        self.field = field
+        self.values = values
+
+    def isEligible(self, value):
+        return value in self.values
+
+    def select(self, issue):
+        """
+        Check an issue of the issue list, or the "issue" of the issue data details.
+        Issues the list does not give the field of are kept, the details tell later.
+        return: (bool)
+        """
+        if self.field not in issue:
+            return True
+        return self.isEligible(issue[self.field])
+
+    def selectDetails(self, list_issueDetails):
+        """
+        Keep the issue data details of the forms that are updated.
+        return: (list)list_issueDetails
+        """
+        return [
+            issueDetail
+            for issueDetail in list_issueDetails
+            if self.isEligible(issueDetail["issue"].get(self.field))
+        ]
+
+    def query(self):
+        """
+        The filter of the issue list query, for the servers that filter by the field.
+        Only a single value can be asked for.
+        return: (dict)params, empty if the rule has more than one value
+        """
+        if len(self.values) != 1:
+            return {}
+        return {self.field: self.values[0]}
+
+
+RSS_ELIGIBILITY = EligibilityRule("status", RSS_UPDATE_STATUSES)
+POST_OT_ELIGIBILITY = EligibilityRule("state", POST_OT_UPDATE_STATES)
+
+# Properties that change on every run, only sent along with a real change
+VOLATILE_PROPERTIES = ("Updated__x0020__Date", "Updated__x0020__Date__x0020__By")
+
+# One update of buildRSSPayloads / buildPostOTPayloads
+# current holds the "properties.<key>" values the issue has for the payload properties
+IssuePayload = namedtuple("IssuePayload", ["issueId", "label", "payload", "current"])
+
+# Payload property, computed column
+RSS_TOTALS = (
+    ("TotalOff", "TotalOff"),
+    ("TotalLeaves", "TotalLeaves"),
+    # ("TotalMCs", "Sum_SickLeave"),
+    ("TotalOtherRemarks", "Sum_Others"),
+    ("TotalCovered", "TotalCovered"),
+    ("TotalNonCovered", "TotalNonCovered"),
+    ("Total__x0020__Working__x0020__Days", "Total__x0020__Working__x0020__Days"),
+    ("TotalWorkingHours", "Sum_WorkingHours"),
+    ("Total__x0020__Overtime__x0020__Hours", "Total_x200_Overtime_Hours"),
+)
+
+
+def rowRecords(df, columns):
+    """
+    Walk the dataframe once, row by row, keeping only some columns.
+    input: (pandas.DataFrame)df
+           (iterable)columns, The columns to keep, the ones df does not have are left out.
+    return: (generator) one dict {column: value} per row
+    """
+    columns = [column for column in dict.fromkeys(columns) if column in df.columns]
+    arrays = [df[column].to_numpy() for column in columns]
+    for values in zip(*arrays):
+        yield dict(zip(columns, values))
+
+
+def currentProperties(record, properties):
+    return {
+        "properties." + key: record["properties." + key]
+        for key in properties
+        if "properties." + key in record
+    }
+
+
+def buildRSSPayloads(df, today):
+    """
+    Build the update payloads of the RSS Attendance forms in one pass over the computed frame.
+    input: (pandas.DataFrame)df, The RSS frame with the totals of rssStatusTotals and rssHourTotals.
+           (datetime.date)today
+    return: (generator) one IssuePayload per form eligible by RSS_ELIGIBILITY
+    """
+    days = [
+        d for d in range(1, 32) if "D" + str(d) + "_Work_Hour" in df.columns
+    ]
+    day_properties = []
+    for d in days:
+        day_properties.append("D" + str(d) + "__x0020__Work__x0020__Hour")
+        day_properties.append("D" + str(d) + "__x0020__OT")
+    properties = [key for key, column in RSS_TOTALS] + day_properties
+
+    columns = ["id", "number", "status", "assignee.displayName", "assignee.id"]
+    columns += [column for key, column in RSS_TOTALS]
+    columns += ["D" + str(d) + "_Work_Hour" for d in days]
+    columns += ["D" + str(d) + "OT" for d in days]
+    columns += ["properties." + key for key in properties]
+
+    for record in rowRecords(df, columns):
+        if not RSS_ELIGIBILITY.isEligible(record[RSS_ELIGIBILITY.field]):
+            continue
+
+        ##Collate all the work hour needs to be updated
+        AddRemarks = {}
+        for d in days:
+            work_hour = record["D" + str(d) + "_Work_Hour"]
+            # Append the work hour as 0 into the remarks to be updated if it is a null value
+            AddRemarks["D" + str(d) + "__x0020__Work__x0020__Hour"] = (
+                0 if pd.isnull(work_hour) else int(work_hour)
+            )
+            # Append OT Hour
+            ot = record.get("D" + str(d) + "OT")
+            if ot is not None and not pd.isnull(ot):
+                AddRemarks["D" + str(d) + "__x0020__OT"] = ot
+
+        updatejsonload = {
+            "assignee": {
+                "displayName": str(record["assignee.displayName"]),
+                "id": str(record["assignee.id"]),
+            },
+            "properties": {
+                "Updated__x0020__Date__x0020__By": str(today),
+                "TotalOff": record["TotalOff"],
+                "TotalLeaves": record["TotalLeaves"],
+                "TotalOtherRemarks": record["Sum_Others"],
+                "TotalCovered": record["TotalCovered"],
+                "TotalNonCovered": record["TotalNonCovered"],
+                "Total__x0020__Working__x0020__Days": str(
+                    record["Total__x0020__Working__x0020__Days"]
+                ),
+                "TotalWorkingHours": record["Sum_WorkingHours"],
+                "Total__x0020__Overtime__x0020__Hours": record[
+                    "Total_x200_Overtime_Hours"
+                ],
+            },
+        }
+        updatejsonload["properties"].update(AddRemarks)
+
+        yield IssuePayload(
+            record["id"],
+            "[{}] {}".format(record["number"], str(record["assignee.displayName"])),
+            updatejsonload,
+            currentProperties(record, updatejsonload["properties"]),
+        )
+
+
+def buildPostOTPayloads(df, today):
+    """
+    Build the update payloads of the Post OT forms in one pass over the computed frame.
+    input: (pandas.DataFrame)df, The Post OT frame with its PostOTHour column.
+           (datetime.date)today
+    return: (generator) one IssuePayload per form eligible by POST_OT_ELIGIBILITY
+    """
+    columns = [
+        "id",
+        "number",
+        "state",
+        "assignee.displayName",
+        "assignee.id",
+        "PostOTHour",
+        "properties.RSS__x0020__OT__x0020__1",
+    ]
+
+    for record in rowRecords(df, columns):
+        if not POST_OT_ELIGIBILITY.isEligible(record[POST_OT_ELIGIBILITY.field]):
+            continue
+
+        updatejsonload = {
+            "assignee": {
+                "displayName": str(record["assignee.displayName"]),
+                "id": str(record["assignee.id"]),
+            },
+            "properties": {
+                "Updated__x0020__Date": str(today),
+                "RSS__x0020__OT__x0020__1": record["PostOTHour"],
+            },
+        }
+
+        yield IssuePayload(
+            record["id"],
+            "[{}] {}".format(record["number"], str(record["assignee.displayName"])),
+            updatejsonload,
+            currentProperties(record, updatejsonload["properties"]),
+        )
+
+
+def isSameValue(value, current):
+    """
+    Compare a computed property value with the value the issue holds.
+    Numbers are compared numerically, so 8, 8.0 and "8.0" are the same, and two
+    missing values (None or NaN) are the same.
+    return: (bool)
+    """
+    if pd.isnull(value) or pd.isnull(current):
+        return bool(pd.isnull(value) and pd.isnull(current))
+    try:
+        return math.isclose(float(value), float(current), abs_tol=1e-9)
+    except (TypeError, ValueError):
+        return str(value) == str(current)
+
+
+def diffPayload(updatejsonload, current):
+    """
+    Trim an update payload to the properties whose value differs from the issue.
+    input: (dict)updatejsonload, The update with its "properties".
+           (mapping)current, The "properties.*" values of the issue, e.g. IssuePayload.current
+           or the issue row of the dataframe.
+    return: (dict)updatejsonload, The trimmed update, or None if nothing has changed.
+    """
+    properties = updatejsonload["properties"]
+    changed = {}
+    for key, value in properties.items():
+        if key in VOLATILE_PROPERTIES:
+            continue
+        column = "properties." + key
+        if column not in current or not isSameValue(value, current[column]):
+            changed[key] = value
+
+    if not changed:
+        return None
+
+    for key in VOLATILE_PROPERTIES:
+        if key in properties:
+            changed[key] = properties[key]
+    return dict(updatejsonload, properties=changed)